@@ -1,9 +1,12 @@
-import json
-import requests
+from knowledge_store import open_knowledge
+from web_fetch import DUCKDUCKGO, WIKIPEDIA, FetchError, WebFetcher
 
 class MasterAI:
-    def __init__(self, memory_file="master_memory.json"):
+    def __init__(self, memory_file="master_memory.json", fetcher=None):
         self.memory_file = memory_file
+        self.fetcher = fetcher or WebFetcher(
+            endpoints=(WIKIPEDIA, DUCKDUCKGO), user_agent="MasterAI/1.0 (https://github.com/Ujjwall/VK-SpiralAI)")
+        self.journal = open_knowledge(memory_file)
         self.knowledge = {}
         self.load_memory()
     
@@ -11,9 +14,24 @@ class MasterAI:
         """Learns and stores knowledge permanently."""
         word = word.upper()
         self.knowledge[word] = meaning
-        self.save_memory()
+        self.journal.set([word], meaning)
         print(f"✅ Learned: {word} - {meaning}")
 
+    def learn_many(self, pairs):
+        """
+        Learns (word, meaning) pairs from any iterable, e.g. a streamed glossary.
+        All changes are persisted together in one write at the end.
+        :return: Number of pairs learned.
+        """
+        count = 0
+        with self.journal.batch():
+            for word, meaning in pairs:
+                word = word.upper()
+                self.knowledge[word] = meaning
+                self.journal.set([word], meaning)
+                count += 1
+        return count
+
     def recall(self, word):
         """Retrieves meaning or learns if unknown."""
         word = word.upper()
@@ -36,48 +54,28 @@ class MasterAI:
         return "I couldn't find that word and no one taught me."
 
     def save_memory(self):
-        """Saves learned knowledge."""
-        with open(self.memory_file, "w") as f:
-            json.dump(self.knowledge, f)
+        """Saves learned knowledge as a full snapshot."""
+        self.journal.save(self.knowledge)
 
     def load_memory(self):
         """Loads stored knowledge."""
-        try:
-            with open(self.memory_file, "r") as f:
-                self.knowledge = json.load(f)
-                print("🧠 Memory Loaded Successfully!")
-        except FileNotFoundError:
+        if self.journal.exists():
+            print("🧠 Memory Loaded Successfully!")
+        else:
             print("🔄 No memory found, starting fresh.")
+        self.knowledge = self.journal.load()
 
     def web_search(self, query):
         """First tries Wikipedia, then DuckDuckGo if Wikipedia fails."""
-        # Wikipedia API
-        wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{query}"
-        headers = {"User-Agent": "MasterAI/1.0 (https://github.com/Ujjwall/VK-SpiralAI)"}
-
-        try:
-            response = requests.get(wiki_url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("extract", "")
-                if summary:
-                    return summary
-        
-        except requests.exceptions.RequestException:
-            print(f"❌ Wikipedia search failed for: {query}")
-
-        # If Wikipedia fails, try DuckDuckGo
-        duck_url = f"https://api.duckduckgo.com/?q={query}&format=json"
+        # The fetcher tries Wikipedia, then DuckDuckGo, and caches the outcome
         try:
-            response = requests.get(duck_url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("AbstractText", "")
-                if summary:
-                    return summary
+            summary = self.fetcher.search(query)
+        except FetchError as error:
+            print(f"❌ Web search failed for: {query} ({error})")
+            summary = None
 
-        except requests.exceptions.RequestException:
-            print(f"❌ DuckDuckGo search failed for: {query}")
+        if summary:
+            return summary
 
         return "I couldn't find anything on that topic."
 
@@ -108,6 +106,7 @@ class MasterAI:
                 print("Master AI: I am still learning! Try asking 'Define Apple' or 'What is the Sun'.")
 
 # 🚀 Run AI
-ai = MasterAI()
-ai.chat()
+if __name__ == "__main__":
+    ai = MasterAI()
+    ai.chat()
 
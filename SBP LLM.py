@@ -2,6 +2,8 @@ pip install nltk
 import random
 import nltk
 from datetime import datetime
+
+from ring_buffer import RingBuffer
 from nltk.tokenize import word_tokenize
 from nltk.corpus import words
 
@@ -14,7 +16,7 @@ class SpiralLanguageAI:
         """Initializes SBP LLM with a base vocabulary and self-learning mechanism."""
         self.growth_factor = random.uniform(1.1, 1.3)  # Expands linguistic learning dynamically
         self.adaptability = adaptability
-        self.memory = []
+        self.memory = RingBuffer(5)  # Keeps last 5 learning states
         self.last_update = datetime.now()
         self.vocabulary = base_vocab if base_vocab else ["Hello", "world", "AI", "learning"]
         self.sentences = []
@@ -24,7 +26,6 @@ class SpiralLanguageAI:
         time_elapsed = (datetime.now() - self.last_update).total_seconds()
         self.growth_factor += self.adaptability * random.uniform(-0.05, 0.05)
         self.memory.append(self.growth_factor)
-        self.memory = self.memory[-5:]  # Keeps last 5 learning states
         self.last_update = datetime.now()
         return self.growth_factor
 
@@ -1,15 +1,16 @@
+from collections import deque
+
 import numpy as np
 
 class SpiralAI:
     def __init__(self, memory_size=5):
         self.memory_size = memory_size
-        self.memory = []  # Stores past numbers in a spiral-learning fashion
+        # Stores past numbers in a spiral-learning fashion; a deque, since Fibonacci values outgrow int64
+        self.memory = deque(maxlen=memory_size)
 
     def update_memory(self, number):
         """Updates memory by keeping recent but relevant past values."""
-        self.memory.append(number)
-        if len(self.memory) > self.memory_size:
-            self.memory.pop(0)  # Keep last values but remove the oldest
+        self.memory.append(number)  # The deque drops the oldest value once full
 
     def predict_next(self):
         """Predicts the next number based on Fibonacci pattern, strictly enforcing sum rule."""
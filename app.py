@@ -1,44 +1,102 @@
-from flask import Flask, render_template, request, jsonify
-import json
+from flask import Flask, Response, stream_with_context, render_template, request, jsonify
+import os
 import re
+import sys
+
+from chat_asgi import BAD_BATCH, ChatServer, batch_messages, ndjson_results, serve
+from knowledge_index import FuzzyIndex
+from knowledge_store import open_index, open_knowledge
+from response_cache import ResponseCache
+from session_store import ReadWriteLock
 
 app = Flask(__name__, template_folder="C:/Users/ujjwa/Downloads/templates_")  # Update this path
 
 class SpiralAI:
     def __init__(self, memory_file="memory.json"):
         self.memory_file = memory_file
+        self.journal = open_knowledge(memory_file, indent=4)
         self.knowledge = {}
+        self._fuzzy_index = None  # Built on the first recall miss
+        self.response_cache = ResponseCache()  # "What is" answers, until the next learn
+        self.version = 0  # Bumped by every change to the knowledge
+        self.lock = ReadWriteLock()  # Server threads share one knowledge base
         self.load_memory()
 
     def save_memory(self):
-        """Saves learned knowledge to memory.json."""
+        """Saves learned knowledge to memory.json as a full snapshot."""
         try:
-            with open(self.memory_file, "w") as f:
-                json.dump(self.knowledge, f, indent=4)
+            with self.lock.write():
+                self.journal.save(self.knowledge)
         except Exception as e:
             print(f"Error saving memory: {e}")
 
     def load_memory(self):
         """Loads stored knowledge from memory.json."""
-        try:
-            with open(self.memory_file, "r") as f:
-                self.knowledge = json.load(f)
+        if self.journal.exists():
             print("🧠 Memory Loaded Successfully!")
-        except FileNotFoundError:
+        else:
             print("🔄 No memory found, starting fresh.")
-            self.knowledge = {}
+        with self.lock.write():
+            self.knowledge = self.journal.load()
+            self._fuzzy_index = None
+            self.version += 1
 
     def learn(self, word, meaning):
         """Stores new knowledge and saves it."""
         word = word.upper()
-        self.knowledge[word] = meaning
-        self.save_memory()  # Save updates immediately
+        with self.lock.write():
+            if word not in self.knowledge and self._fuzzy_index is not None:
+                self._fuzzy_index.add(word)
+            self.knowledge[word] = meaning
+            self.journal.set([word], meaning)  # Journal the update; compaction folds it into memory.json
+            self.version += 1
         return f"✅ Learned: {word} - {meaning}"
 
+    def learn_many(self, pairs):
+        """
+        Learns (word, meaning) pairs from any iterable, e.g. a streamed glossary.
+        All changes are persisted together in one write at the end.
+        :return: Number of pairs learned.
+        """
+        count = 0
+        with self.lock.write(), self.journal.batch():
+            for word, meaning in pairs:
+                word = word.upper()
+                if word not in self.knowledge and self._fuzzy_index is not None:
+                    self._fuzzy_index.add(word)
+                self.knowledge[word] = meaning
+                self.journal.set([word], meaning)
+                count += 1
+            self.version += 1
+        return count
+
     def recall(self, word):
         """Retrieves stored knowledge."""
         word = word.upper()
-        return self.knowledge.get(word, None)
+        with self.lock.read():
+            return self.knowledge.get(word, None)
+
+    @property
+    def fuzzy_index(self):
+        if self._fuzzy_index is None:
+            self._fuzzy_index = open_index(FuzzyIndex, self.knowledge)
+        return self._fuzzy_index
+
+    def suggest(self, word):
+        """Returns the stored word closest to a misspelled one, or None."""
+        with self.lock.read():
+            return self.fuzzy_index.best(word.upper())
+
+    def answer(self, word):
+        """Answers "what is <word>" from stored knowledge."""
+        stored_info = self.recall(word)
+        if stored_info:
+            return stored_info
+
+        suggestion = self.suggest(word)
+        if suggestion:
+            return f"Did you mean {suggestion}? {self.knowledge[suggestion]}"
+        return f"🔍 I don't know about {word} yet. Can you define it?"
 
     def compute_math(self, expression):
         """Evaluates basic arithmetic expressions."""
@@ -70,18 +128,23 @@ class SpiralAI:
         # Handle recall of known concepts
         elif user_input.lower().startswith("what is "):
             word = user_input[8:].strip()
-            stored_info = self.recall(word)
-
-            if stored_info:
-                return stored_info
-            else:
-                return f"🔍 I don't know about {word} yet. Can you define it?"
+            return self.response_cache.lookup(word, self.version, lambda: self.answer(word))
 
         return "I am still learning! Try asking 'Define Gravity' or 'What is Evolution'."
 
 
 # Initialize Spiral AI Model
-spiral_ai = SpiralAI()
+spiral_ai = SpiralAI(os.environ.get("SPIRAL_MEMORY_FILE", "memory.json"))  # e.g. a .db store for fast worker startup
+
+def reply(user_message, session_id=None):
+    """
+    Answers one chat message, for both the Flask and ASGI /chat.
+    :param session_id: Accepted for ChatServer's handler signature; this app keeps no conversation context.
+    """
+    user_message = user_message.strip()
+    if not user_message:
+        return "Please enter a valid message."
+    return spiral_ai.process_query(user_message)
 
 @app.route("/")
 def index():
@@ -90,13 +153,22 @@ def index():
 @app.route("/chat", methods=["POST"])
 def chat():
     data = request.get_json()
-    user_message = data.get("message", "").strip()
+    return jsonify({"response": reply(data.get("message", ""))})
 
-    if not user_message:
-        return jsonify({"response": "Please enter a valid message."})
+@app.route("/chat/batch", methods=["POST"])
+def chat_batch():
+    """Answers a list of messages, streaming one JSON line per message as it completes."""
+    data = request.get_json(silent=True)
+    messages = batch_messages(data)
+    if messages is None:
+        return Response(BAD_BATCH, status=400, mimetype="application/json")
+    return Response(stream_with_context(ndjson_results(reply, messages, None)), mimetype="application/x-ndjson")
 
-    response = spiral_ai.process_query(user_message)
-    return jsonify({"response": response})
+# ⚡ Async serving: uvicorn app:asgi_app (or python app.py --asgi)
+asgi_app = ChatServer(reply, app)
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    if "--asgi" in sys.argv:
+        serve(asgi_app)
+    else:
+        app.run(debug=True)
@@ -0,0 +1,251 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from benchmark_knowledge_index import synthetic_concepts
+
+APPS = ("app", "webapp")
+INTENTS = ("define", "what_is", "learn", "math")
+# Intents each service really handles: the web app learns only through "define" (web search)
+# and has no "X - meaning" or math handling, so those messages would just time its fallback reply
+APP_INTENTS = {"app": INTENTS, "webapp": ("define", "what_is")}
+DEFAULT_MIX = "define=0.1,what_is=0.6,learn=0.2,math=0.1"
+
+class StubFetcher:
+    """Stands in for WebFetcher: answers every lookup locally after a fixed delay."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def search(self, query):
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{query} is a synthetic topic."
+
+def seed_app(concepts, lookup_latency):
+    """app.py: one meaning per word."""
+    import app
+
+    app.spiral_ai.knowledge = {concept: f"Meaning of {concept.lower()}." for concept in concepts}
+    app.spiral_ai.version += 1
+    return app.app
+
+def seed_webapp(concepts, lookup_latency):
+    """evolvingmindwebapp.py: one interned explanation per concept, indexes built up front."""
+    import evolvingmindwebapp
+    from knowledge_graph import index_explanations
+
+    ai = evolvingmindwebapp.ai
+    ai.fetcher = StubFetcher(lookup_latency)
+    ai.explanations = [f"Explanation of {concept.lower()}." for concept in concepts]
+    ai.knowledge = {concept: [i] for i, concept in enumerate(concepts)}
+    ai.links = {}
+    ai.explanation_ids = index_explanations(ai.explanations)
+    ai.rebuild_index()
+    ai.version += 1
+    return evolvingmindwebapp.app
+
+SEEDERS = {"app": seed_app, "webapp": seed_webapp}
+
+def parse_mix(text):
+    """Parses "define=0.1,what_is=0.6,..." into intent weights."""
+    mix = {}
+    for part in text.split(","):
+        intent, weight = part.split("=")
+        if intent not in INTENTS:
+            raise ValueError(f"Unknown intent: {intent!r} (expected one of {', '.join(INTENTS)})")
+        mix[intent] = float(weight)
+    return mix
+
+def make_traffic(concepts, count, mix, users, seed):
+    """Returns count (intent, message, session id) triples drawn from the mix."""
+    rng = random.Random(seed)
+    intents = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    fresh = itertools.count()
+    traffic = []
+    for intent in intents:
+        if intent == "define":
+            message = f"define Newterm{next(fresh)}"
+        elif intent == "what_is":
+            # Skewed towards a hot set of concepts, as real questions are
+            message = f"what is {concepts[int(len(concepts) * rng.random() ** 3)].lower()}"
+        elif intent == "learn":
+            message = f"Newfact{next(fresh)} - a fact learned under load"
+        else:
+            message = f"{rng.randint(1, 999)} {rng.choice('+-*/')} {rng.randint(1, 999)}"
+        traffic.append((intent, message, f"user{rng.randrange(users)}"))
+    return traffic
+
+def drive(flask_app, traffic, concurrency):
+    """Posts every message to /chat from concurrency threads; returns (wall seconds, latencies by intent)."""
+    local = threading.local()
+
+    def send(item):
+        intent, message, session_id = item
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        start = time.perf_counter()
+        response = client.post("/chat", json={"message": message, "session_id": session_id})
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"/chat returned {response.status_code} for {message!r}")
+        return intent, elapsed
+
+    latencies = {}
+    with ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        for intent, elapsed in pool.map(send, traffic):
+            latencies.setdefault(intent, []).append(elapsed)
+        wall = time.perf_counter() - start
+    return wall, latencies
+
+def summarize(latencies):
+    milliseconds = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {"count": len(milliseconds), "mean_ms": float(milliseconds.mean()),
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+def run_case(app_name, size, requests, concurrency, mix, users, lookup_latency, warmup, seed):
+    """Seeds one service with size concepts, drives the traffic in this process and returns its measurements."""
+    # Memory files, journals and caches all go to a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="chat_load_"))
+    os.environ["SPIRAL_MEMORY_FILE"] = os.path.join(os.getcwd(), "memory.json")
+    mix = {intent: weight for intent, weight in mix.items() if intent in APP_INTENTS[app_name]}
+    if not mix:
+        raise ValueError(f"The mix has none of the intents {app_name} handles: {', '.join(APP_INTENTS[app_name])}")
+    start = time.perf_counter()
+    concepts = synthetic_concepts(size)
+    flask_app = SEEDERS[app_name](concepts, lookup_latency)
+    seed_seconds = time.perf_counter() - start
+
+    drive(flask_app, make_traffic(concepts, warmup, mix, users, seed + 1), concurrency)
+    wall, latencies = drive(flask_app, make_traffic(concepts, requests, mix, users, seed), concurrency)
+    everything = [elapsed for intent_latencies in latencies.values() for elapsed in intent_latencies]
+    return {
+        "app": app_name,
+        "concepts": size,
+        "requests": requests,
+        "concurrency": concurrency,
+        "mix": mix,
+        "lookup_ms": lookup_latency * 1000,
+        "seed_s": seed_seconds,
+        "wall_s": wall,
+        "throughput_rps": requests / wall,
+        "overall": summarize(everything),
+        "intents": {intent: summarize(latencies[intent]) for intent in INTENTS if intent in latencies},
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def run_isolated(args, app_name, size):
+    """Runs a case in a fresh interpreter, so each starts from an empty module state and its own peak RSS."""
+    command = [sys.executable, os.path.abspath(__file__), "--case", app_name, "--sizes", str(size),
+               "--requests", str(args.requests), "--concurrency", str(args.concurrency), "--mix", args.mix,
+               "--users", str(args.users), "--lookup-ms", str(args.lookup_ms), "--warmup", str(args.warmup),
+               "--seed", str(args.seed)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"app": app_name, "concepts": size, "concurrency": args.concurrency,
+                "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def case_key(result):
+    """What makes two runs the same case: service, size, load, effective mix and lookup latency."""
+    mix = tuple(sorted(result.get("mix", {}).items()))
+    return (result["app"], result["concepts"], result["concurrency"], result.get("requests"), mix,
+            result.get("lookup_ms"))
+
+def compare(results, baseline_path, tolerance):
+    """
+    Returns (regressions, compared): the cases whose throughput dropped more than
+    tolerance below the same case in the baseline file, and how many cases matched one.
+    """
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    previous = {case_key(r): r for r in baseline["results"] if "throughput_rps" in r}
+    regressions = []
+    compared = 0
+    for result in results:
+        key = case_key(result)
+        if key in previous and "throughput_rps" in result:
+            compared += 1
+            ratio = result["throughput_rps"] / previous[key]["throughput_rps"]
+            if ratio < 1 - tolerance:
+                regressions.append({"case": key[:3], "ratio": ratio})
+    return regressions, compared
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /chat of the Flask chat services as their knowledge grows.")
+    parser.add_argument("--apps", nargs="+", default=list(APPS), choices=APPS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads sending requests at once.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Intent weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--users", type=int, default=1000, help="Distinct session ids in the traffic.")
+    parser.add_argument("--lookup-ms", type=float, default=0.0, help="Delay of the stubbed web_search.")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed requests sent first.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="chat_load_benchmark.json")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--case", choices=APPS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.sizes[0], args.requests, args.concurrency, mix, args.users,
+                                  args.lookup_ms / 1000, args.warmup, args.seed)))
+        return
+
+    results = []
+    for size in args.sizes:
+        for app_name in args.apps:
+            result = run_isolated(args, app_name, size)
+            results.append(result)
+            if "error" in result:
+                print(f"{app_name:>7} N={size:<8} skipped: {result['error']}")
+                continue
+            print(f"{app_name:>7} N={size:<8} {result['throughput_rps']:9,.0f} req/s  "
+                  f"p50 {result['overall']['p50_ms']:7.2f} ms  p95 {result['overall']['p95_ms']:7.2f} ms  "
+                  f"p99 {result['overall']['p99_ms']:7.2f} ms  (seeded in {result['seed_s']:.1f} s)")
+            for intent, stats in result["intents"].items():
+                print(f"{'':>18}{intent:>8}: p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  "
+                      f"p99 {stats['p99_ms']:7.2f} ms  ({stats['count']} requests)")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "mix": mix, "users": args.users,
+                   "lookup_ms": args.lookup_ms, "warmup": args.warmup, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions, compared = compare(results, args.baseline, args.tolerance)
+        if not compared:
+            print(f"No case in {args.baseline} ran with the same mix, request count and lookup latency")
+        for regression in regressions:
+            print(f"Regression: {regression['case']} at {regression['ratio']:.0%} of baseline throughput")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from evolvingmindimprovedversion import SpiralAI
+
+WORDS = ["QUANTUM", "CLIMATE", "NEURAL", "MARKET", "OCEAN", "SOLAR", "GENE", "TRADE", "SPIRAL", "DATA",
+         "ENERGY", "CELL", "GRAVITY", "NETWORK", "SIGNAL", "FOREST", "METAL", "LIGHT", "SOUND", "WATER"]
+
+def synthetic_concepts(count, seed=7):
+    """Returns count distinct multi-word concept names over a growing vocabulary."""
+    rng = random.Random(seed)
+    vocabulary = WORDS + [f"TERM{i}" for i in range(max(count // 10, 1))]
+    concepts = {}
+    while len(concepts) < count:
+        name = " ".join(rng.sample(vocabulary[:20], 1) + rng.sample(vocabulary, rng.randint(1, 2)))
+        concepts[name] = None
+    return list(concepts)
+
+def legacy_find_related(knowledge, concept):
+    """The original full scan, splitting every stored key on every call."""
+    concept_words = concept.split()
+    return [key for key in knowledge if any(word in key.split() for word in concept_words)]
+
+def legacy_containment(knowledge, concept):
+    """The original reinforce_connections scan over every stored concept."""
+    return [key for key in knowledge if concept in key or key in concept]
+
+def time_lookups(function, queries):
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+def run_benchmark(sizes, lookups, legacy_limit):
+    print(f"{'concepts':>10} {'words: index ms':>16} {'scan ms':>10} {'substrings: index ms':>21} {'scan ms':>10}")
+    memory_file = os.path.join(tempfile.mkdtemp(), "benchmark_memory.json")
+    for size in sizes:
+        ai = SpiralAI(memory_file=memory_file)
+        concepts = synthetic_concepts(size)
+        ai.knowledge = {concept: [] for concept in concepts}
+        ai.rebuild_index()
+        # Rare words keep result sets small, so the timing shows lookup cost, not output size
+        queries = [f"TERM{random.randrange(max(size // 10, 1))} X" for _ in range(lookups)]
+        names = random.sample(concepts, min(lookups, len(concepts)))
+        words = time_lookups(ai.find_related_concepts, queries)
+        substrings = time_lookups(ai.substring_index.related, names)
+        if size <= legacy_limit:
+            words_scan = f"{time_lookups(lambda query: legacy_find_related(ai.knowledge, query), queries[:20]):10.3f}"
+            substrings_scan = f"{time_lookups(lambda name: legacy_containment(ai.knowledge, name), names[:20]):10.3f}"
+        else:
+            words_scan = substrings_scan = f"{'skipped':>10}"
+        print(f"{size:>10} {words:16.4f} {words_scan} {substrings:21.4f} {substrings_scan}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark find_related_concepts as the knowledge base grows.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--legacy-limit", type=int, default=100000,
+                        help="Largest size at which the original full scan is also timed.")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.lookups, args.legacy_limit)
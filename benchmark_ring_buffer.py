@@ -0,0 +1,38 @@
+import time
+
+from ring_buffer import RingBuffer
+
+class ListMemory:
+    """The original list-based memory: append, then pop(0) once over the limit."""
+
+    def __init__(self, memory_limit):
+        self.memory = []
+        self.capacity = memory_limit
+
+    def append(self, value):
+        self.memory.append(value)
+        if len(self.memory) > self.capacity:
+            self.memory.pop(0)
+
+def time_per_step(memory, steps):
+    """Returns the average cost of one memory update in nanoseconds."""
+    for step in range(memory.capacity):
+        memory.append(float(step))  # Fill first so every timed step evicts
+    start = time.perf_counter()
+    for step in range(steps):
+        memory.append(float(step))
+    return (time.perf_counter() - start) / steps * 1e9
+
+def run_benchmark(limits=(10, 100, 1000, 10000, 100000), steps=200000):
+    """Measures per-step memory cost for growing memory limits."""
+    print(f"{'memory_limit':>12} {'list.pop(0) ns':>16} {'RingBuffer ns':>14}")
+    results = []
+    for limit in limits:
+        list_ns = time_per_step(ListMemory(limit), steps)
+        ring_ns = time_per_step(RingBuffer(limit), steps)
+        results.append((limit, list_ns, ring_ns))
+        print(f"{limit:>12} {list_ns:>16.1f} {ring_ns:>14.1f}")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+BACKENDS = ("serial", "vectorized", "multiprocessing", "spark")
+
+def run_serial(start_values, steps, workers):
+    """One Python SpiralAI object per instance, stepped with next_value()."""
+    from spiral_ai import SpiralAI
+    for start in start_values:
+        spiral_ai = SpiralAI(start=start, memory_limit=1000, adaptability=0, log_space=True)
+        for _ in range(steps):
+            spiral_ai.next_value()
+
+def run_vectorized(start_values, steps, workers):
+    """Every instance in one SpiralEnsemble, in this process."""
+    from spiral_ai_multiprocessing import spiral_block_trajectories
+    spiral_block_trajectories(start_values, steps, log_space=True)
+
+def run_multiprocessing(start_values, steps, workers):
+    """Process pool writing into shared memory (run_spiral_shared)."""
+    from spiral_ai_multiprocessing import run_spiral_shared
+    run_spiral_shared(start_values, steps, processes=workers, log_space=True).close()
+
+def run_spark(start_values, steps, workers):
+    """Spark in local[workers] mode, one vectorized block per partition."""
+    from pyspark.sql import SparkSession
+    import ring_buffer
+    import spiral_ai
+    import spiral_ai_multiprocessing
+    import spiral_rng
+
+    spark = SparkSession.builder.master(f"local[{workers}]").appName("SpiralAI-Benchmark").getOrCreate()
+    try:
+        for module in (ring_buffer, spiral_rng, spiral_ai, spiral_ai_multiprocessing):
+            spark.sparkContext.addPyFile(module.__file__)
+
+        def run_partition(values):
+            from spiral_ai_multiprocessing import spiral_block_trajectories
+            values = list(values)
+            if values:
+                yield len(spiral_block_trajectories(values, steps, log_space=True))
+
+        rdd = spark.sparkContext.parallelize(start_values, workers * 4)
+        rdd.mapPartitions(run_partition).sum()
+    finally:
+        spark.stop()
+
+RUNNERS = {
+    "serial": run_serial,
+    "vectorized": run_vectorized,
+    "multiprocessing": run_multiprocessing,
+    "spark": run_spark,
+}
+
+def run_case(backend, instances, steps, workers):
+    """Runs one case in this process and returns its measurements."""
+    start_values = list(range(1, instances + 1))
+    start = time.perf_counter()
+    RUNNERS[backend](start_values, steps, workers)
+    wall = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; children covers pool workers (Spark's JVM is not counted)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "backend": backend,
+        "instances": instances,
+        "steps": steps,
+        "workers": workers,
+        "wall_s": wall,
+        "steps_per_s": instances * steps / wall,
+        "peak_rss_mb": own / 1024,
+        "peak_child_rss_mb": children / 1024,
+    }
+
+def run_isolated(backend, instances, steps, workers):
+    """Runs a case in a fresh interpreter so peak RSS is not polluted by earlier cases."""
+    command = [sys.executable, os.path.abspath(__file__), "--case", backend,
+               "--instances", str(instances), "--steps", str(steps), "--workers", str(workers)]
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        return {"backend": backend, "instances": instances, "steps": steps, "workers": workers,
+                "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def add_scaling_efficiency(results):
+    """Scaling efficiency = speedup over the same backend at 1 worker, divided by workers."""
+    single = {(r["backend"], r["instances"]): r["wall_s"]
+              for r in results if r.get("workers") == 1 and "wall_s" in r}
+    for result in results:
+        baseline = single.get((result["backend"], result["instances"]))
+        if baseline and "wall_s" in result:
+            result["scaling_efficiency"] = baseline / result["wall_s"] / result["workers"]
+
+def compare(results, baseline_path, tolerance):
+    """Returns the cases whose steps/sec dropped more than tolerance below the baseline file."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    previous = {(r["backend"], r["instances"], r["steps"], r["workers"]): r
+                for r in baseline["results"] if "steps_per_s" in r}
+    regressions = []
+    for result in results:
+        key = (result["backend"], result["instances"], result["steps"], result["workers"])
+        if key in previous and "steps_per_s" in result:
+            ratio = result["steps_per_s"] / previous[key]["steps_per_s"]
+            if ratio < 1 - tolerance:
+                regressions.append({"case": key, "ratio": ratio})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Spiral AI execution backends.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--instances", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Worker counts for parallel backends (default: 1, 2, 4, ... up to all cores).")
+    parser.add_argument("--output", default="spiral_backend_benchmark.json")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--case", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        workers = args.workers[0] if args.workers else 1
+        print(json.dumps(run_case(args.case, args.instances[0], args.steps, workers)))
+        return
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+    results = []
+    for instances in args.instances:
+        for backend in args.backends:
+            counts = worker_counts if backend in ("multiprocessing", "spark") else [1]
+            for workers in counts:
+                result = run_isolated(backend, instances, args.steps, workers)
+                results.append(result)
+                if "error" in result:
+                    print(f"{backend:>15} N={instances:<7} workers={workers:<3} skipped: {result['error']}")
+                else:
+                    print(f"{backend:>15} N={instances:<7} workers={workers:<3} "
+                          f"{result['wall_s']:8.3f} s {result['steps_per_s']:14,.0f} steps/s "
+                          f"{result['peak_rss_mb'] + result['peak_child_rss_mb']:8.1f} MB")
+    add_scaling_efficiency(results)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": cores,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression['case']} at {regression['ratio']:.0%} of baseline steps/s")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
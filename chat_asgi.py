@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+
+from session_store import SESSION_COOKIE
+
+BAD_MESSAGE = b'{"error": "Expected a JSON body with a \\"message\\" string."}'
+BAD_BATCH = b'{"error": "Expected a JSON list of messages, or {\\"messages\\": [...]}."}'
+
+def batch_messages(data):
+    """Returns the messages of a /chat/batch body ({"messages": [...]} or a bare list), or None if malformed."""
+    messages = data.get("messages") if isinstance(data, dict) else data
+    if isinstance(messages, list) and all(isinstance(message, str) for message in messages):
+        return messages
+    return None
+
+def ndjson_results(handler, messages, session_id):
+    """Answers messages in order, yielding one {"index", "response"} JSON line as each completes."""
+    for index, message in enumerate(messages):
+        yield json.dumps({"index": index, "response": handler(message, session_id)}) + "\n"
+
+class ChatServer:
+    """
+    ASGI front end for the Flask chat apps: serves the same page and the same
+    POST /chat JSON contract ({"message"} in, {"response"} out).
+    POST /chat/batch answers a list of messages in one request, streaming one
+    NDJSON line per message as it completes.
+    The event loop never runs a handler. Messages that may go online (per
+    needs_lookup) run on a large I/O pool, and everything else runs on a small
+    CPU pool, so hundreds of slow web lookups cannot queue ahead of answers
+    that are already known.
+    """
+
+    def __init__(self, handler, flask_app=None, needs_lookup=None, cpu_workers=None, io_workers=128, sessions=None):
+        """
+        :param handler: handler(message, session_id) -> response text, e.g. SpiralAI.chat_response.
+        :param flask_app: Flask app whose index.html template is served at /.
+        :param needs_lookup: needs_lookup(message) -> True if handling it may wait on the network.
+        :param cpu_workers: Threads for answers from memory (default: CPU count).
+        :param io_workers: Threads for messages that wait on web lookups.
+        :param sessions: The app's SessionStore. Only then are session ids assigned and the
+            session cookie set; otherwise the handler gets session_id None.
+        """
+        self.handler = handler
+        self.sessions = sessions
+        self.flask_app = flask_app
+        self.needs_lookup = needs_lookup
+        self._cpu = ThreadPoolExecutor(cpu_workers or os.cpu_count() or 1, thread_name_prefix="chat-cpu")
+        self._io = ThreadPoolExecutor(io_workers, thread_name_prefix="chat-io")
+        self._page = None
+
+    async def respond(self, message, session_id):
+        """Runs the handler on the pool matching the message."""
+        slow = self.needs_lookup is not None and self.needs_lookup(message)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io if slow else self._cpu, self.handler, message, session_id)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            if scope["path"] == "/chat" and scope["method"] == "POST":
+                await self._chat(scope, receive, send)
+            elif scope["path"] == "/chat/batch" and scope["method"] == "POST":
+                await self._batch(scope, receive, send)
+            elif scope["path"] == "/" and scope["method"] in ("GET", "HEAD"):
+                await self._index(send)
+            else:
+                await self._send(send, 404, b"Not Found", "text/plain")
+
+    async def _chat(self, scope, receive, send):
+        try:
+            data = json.loads(await self._read_body(receive))
+        except ValueError:
+            data = None
+        # A missing message is answered like an empty one, as the Flask /chat routes do
+        message = data.get("message", "") if isinstance(data, dict) else None
+        if not isinstance(message, str):
+            await self._send(send, 400, BAD_MESSAGE, "application/json")
+            return
+        session_id = self._session_id(scope, data)
+        response = await self.respond(message, session_id)
+        await self._send(send, 200, json.dumps({"response": response}).encode(), "application/json",
+                         self._cookie_headers(session_id))
+
+    async def _batch(self, scope, receive, send):
+        try:
+            data = json.loads(await self._read_body(receive))
+        except ValueError:
+            data = None
+        messages = batch_messages(data)
+        if messages is None:
+            await self._send(send, 400, BAD_BATCH, "application/json")
+            return
+        session_id = self._session_id(scope, data)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson"), *self._cookie_headers(session_id)]})
+        # In order, as successive /chat calls would be, since a message can depend on the one before
+        for index, message in enumerate(messages):
+            line = json.dumps({"index": index, "response": await self.respond(message, session_id)}) + "\n"
+            await send({"type": "http.response.body", "body": line.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _index(self, send):
+        if self._page is None:
+            if self.flask_app is None:
+                await self._send(send, 404, b"Not Found", "text/plain")
+                return
+            # Rendered once through Flask, so the template folder setting still applies
+            self._page = (await asyncio.get_running_loop().run_in_executor(self._cpu, self._render)).encode()
+        await self._send(send, 200, self._page, "text/html; charset=utf-8")
+
+    def _render(self):
+        from flask import render_template
+
+        with self.flask_app.app_context():
+            return render_template("index.html")
+
+    def _session_id(self, scope, data):
+        """The request's session id (body, then cookie, else a new one), or None without sessions."""
+        if self.sessions is None:
+            return None
+        return (data.get("session_id") if isinstance(data, dict) else None) or self._cookie(scope) or self.sessions.new_id()
+
+    def _cookie_headers(self, session_id):
+        if session_id is None:
+            return []
+        return [(b"set-cookie", f"{SESSION_COOKIE}={session_id}; HttpOnly; Path=/; SameSite=Lax".encode())]
+
+    @staticmethod
+    def _cookie(scope):
+        for name, value in scope.get("headers", ()):
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(SESSION_COOKIE)
+                if morsel:
+                    return morsel.value
+        return None
+
+    @staticmethod
+    async def _read_body(receive):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return body
+
+    @staticmethod
+    async def _send(send, status, body, content_type, headers=()):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", content_type.encode()),
+                                (b"content-length", str(len(body)).encode()), *headers]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self):
+        self._cpu.shutdown(wait=False)
+        self._io.shutdown(wait=False)
+
+def serve(asgi_app, host="127.0.0.1", port=8000):
+    """Runs an ASGI app under uvicorn (pip install uvicorn), which is imported only here."""
+    import uvicorn
+
+    uvicorn.run(asgi_app, host=host, port=port)
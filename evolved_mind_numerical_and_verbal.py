@@ -1,35 +1,50 @@
-import json
-import requests
 import re
 
+from knowledge_store import open_knowledge
+from web_fetch import FetchError, WebFetcher
+
 class SpiralAI:
-    def __init__(self, memory_file="memory.json"):
+    def __init__(self, memory_file="memory.json", fetcher=None):
         self.memory_file = memory_file
+        self.fetcher = fetcher or WebFetcher()  # Adds the timeout and caching plain requests.get lacked
+        self.journal = open_knowledge(memory_file, indent=4)
         self.knowledge = {}
         self.load_memory()
 
     def save_memory(self):
-        """Saves learned knowledge to a file."""
-        with open(self.memory_file, "w") as f:
-            json.dump(self.knowledge, f, indent=4)
+        """Saves learned knowledge to a file as a full snapshot."""
+        self.journal.save(self.knowledge)
 
     def load_memory(self):
         """Loads stored knowledge."""
-        try:
-            with open(self.memory_file, "r") as f:
-                self.knowledge = json.load(f)
+        if self.journal.exists():
             print("🧠 Memory Loaded Successfully!")
-        except FileNotFoundError:
+        else:
             print("🔄 No memory found, starting fresh.")
-            self.knowledge = {}
+        self.knowledge = self.journal.load()
 
     def learn(self, word, meaning):
         """Stores new knowledge and saves it."""
         word = word.upper()
         self.knowledge[word] = meaning
-        self.save_memory()
+        self.journal.set([word], meaning)
         print(f"✅ Learned: {word} - {meaning}")
 
+    def learn_many(self, pairs):
+        """
+        Learns (word, meaning) pairs from any iterable, e.g. a streamed glossary.
+        All changes are persisted together in one write at the end.
+        :return: Number of pairs learned.
+        """
+        count = 0
+        with self.journal.batch():
+            for word, meaning in pairs:
+                word = word.upper()
+                self.knowledge[word] = meaning
+                self.journal.set([word], meaning)
+                count += 1
+        return count
+
     def recall(self, word):
         """Retrieves stored knowledge or asks the user."""
         word = word.upper()
@@ -40,12 +55,13 @@ class SpiralAI:
 
     def web_search(self, query):
         """Search Wikipedia for a topic."""
-        url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{query}"
-        response = requests.get(url)
+        try:
+            summary = self.fetcher.search(query)
+        except FetchError:
+            return "Error: Couldn't connect to Wikipedia."
 
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("extract", "No information available.")
+        if summary is not None:
+            return summary or "No information available."
 
         return "I couldn't find anything on that topic."
 
@@ -1,12 +1,25 @@
-import json
-import requests
 import random
 
+from knowledge_graph import LINK_TEMPLATES, SECTIONS, index_explanations, is_interned, migrate_legacy_knowledge
+from knowledge_index import FuzzyIndex, SubstringIndex, WordIndex
+from knowledge_store import open_index, open_knowledge
+from web_fetch import FetchError, WebFetcher
+
+COMMANDS = ("define", "what is")
+
 class SpiralAI:
-    def __init__(self, memory_file="spiral_memory.json"):
+    def __init__(self, memory_file="spiral_memory.json", fetcher=None):
         self.memory_file = memory_file
-        self.knowledge = {}  # Stores learned knowledge
+        self.fetcher = fetcher or WebFetcher()  # Pooled, cached Wikipedia lookups
+        self.journal = open_knowledge(memory_file, sections=SECTIONS)  # Appends each change instead of rewriting the file
+        self.knowledge = {}  # Concept -> ids of its explanations
+        self.explanations = []  # Interned explanation texts, indexed by id
+        self.explanation_ids = {}  # Explanation text -> id
+        self.links = {}  # Concept -> {linked concept: link kind}
         self.session_memory = []  # Stores recent interactions
+        self._word_index = None  # Word -> concepts, for find_related_concepts
+        self._substring_index = None  # Name containment, for reinforce_connections
+        self._fuzzy_index = None  # Typo-tolerant names, for recall misses
         self.load_memory()
 
     ### 🌟 MEMORY FUNCTIONS ###
@@ -15,38 +28,109 @@ class SpiralAI:
         """Learns and links a concept to related knowledge."""
         concept = concept.upper()
         
-        if concept in self.knowledge:
-            self.knowledge[concept].append(explanation)
-        else:
-            self.knowledge[concept] = [explanation]
+        if concept not in self.knowledge:
+            self.index_concept(concept)
+        self.add_explanation(concept, explanation)
 
         # 🔥 Auto-Link Related Knowledge!
-        related_concepts = self.find_related_concepts(concept)
-        if related_concepts:
-            for related in related_concepts:
-                self.knowledge[related].append(f"Related to {concept}: {explanation}")
-                self.knowledge[concept].append(f"Connected to {related}: {random.choice(self.knowledge[related])}")
+        for related in self.find_related_concepts(concept):
+            if related != concept:
+                self.add_link(related, concept, "related")
+                self.add_link(concept, related, "connected")
 
         self.reinforce_connections(concept)
-        self.save_memory()
         print(f"✅ Learned: {concept} - {explanation}")
 
+    def learn_many(self, pairs):
+        """
+        Learns (concept, explanation) pairs from any iterable, e.g. a streamed glossary.
+        Concepts are stored and indexed first, then linked in one pass; everything is
+        persisted together at the end instead of once per learn().
+        :return: Number of pairs learned.
+        """
+        learned = []  # Concept of each pair, in arrival order
+        arrival = {}  # New concept -> position of its first pair
+        with self.journal.batch():
+            for concept, explanation in pairs:
+                concept = concept.upper()
+                if concept not in self.knowledge:
+                    arrival[concept] = len(learned)
+                    self.index_concept(concept)
+                self.add_explanation(concept, explanation)
+                learned.append(concept)
+
+            # Link each pair only to concepts present at its position, as successive learn() calls would
+            for position, concept in enumerate(learned):
+                for related in self.find_related_concepts(concept):
+                    if related != concept and arrival.get(related, -1) <= position:
+                        self.add_link(related, concept, "related")
+                        self.add_link(concept, related, "connected")
+                for existing_concept in self.substring_index.related(concept):
+                    if existing_concept != concept and arrival.get(existing_concept, -1) <= position:
+                        self.add_link(existing_concept, concept, "linked")
+        return len(learned)
+
+    def index_concept(self, concept):
+        """Adds a new concept to the lookup indexes (to the fuzzy index only once it is in use)."""
+        self.word_index.add(concept)
+        self.substring_index.add(concept)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(concept)
+
+    def add_explanation(self, concept, explanation):
+        """Attaches an explanation to a concept, storing its text only once."""
+        explanation_id = self.explanation_ids.get(explanation)
+        if explanation_id is None:
+            explanation_id = self.explanation_ids[explanation] = len(self.explanations)
+            self.journal.append(["explanations"], explanation_id, explanation)
+            self.explanations.append(explanation)
+        references = self.knowledge.setdefault(concept, [])
+        if explanation_id not in references:
+            self.journal.append(["concepts", concept], len(references), explanation_id)
+            references.append(explanation_id)
+
+    def add_link(self, concept, other, kind):
+        """Records a link edge from concept to other (one edge per pair)."""
+        links = self.links.setdefault(concept, {})
+        if links.get(other) != kind:
+            links[other] = kind
+            self.journal.set(["links", concept, other], kind)
+
+    def explanations_of(self, concept):
+        return [self.explanations[explanation_id] for explanation_id in self.knowledge[concept]]
+
+    def describe_link(self, other, kind):
+        """Renders a link edge as text, expanding on one of the other concept's explanations."""
+        return LINK_TEMPLATES[kind].format(other, self.explanations[random.choice(self.knowledge[other])])
+
     def recall(self, concept):
         """Retrieves a learned concept and expands its connections."""
         concept = concept.upper()
 
         if concept in self.knowledge:
-            responses = list(set(self.knowledge[concept]))  # Remove duplicates
+            # Pick uniformly among the concept's distinct explanations and links
+            references = self.knowledge[concept]
+            links = self.links.get(concept, {})
+            pick = random.randrange(len(references) + len(links))
+            if pick < len(references):
+                response = self.explanations[references[pick]]
+            else:
+                response = self.describe_link(*list(links.items())[pick - len(references)])
             linked_concepts = self.find_related_concepts(concept)
             reasoning = self.expand_reasoning(concept, linked_concepts)
 
-            return f"{random.choice(responses)} {reasoning}"  # Pick a non-redundant response
+            return f"{response} {reasoning}"
 
         # 🔍 Smart Contextual Recall!
         for past_input in reversed(self.session_memory):
             if concept in past_input and past_input in self.knowledge:
                 return f"You asked about {past_input} earlier. Here's more info: {self.recall(past_input)}"
 
+        # ✏️ Typo-Tolerant Recall!
+        suggestion = self.fuzzy_index.best(concept)
+        if suggestion:
+            return f"Did you mean {suggestion}? {self.recall(suggestion)}"
+
         print(f"🔍 Searching online for: {concept}")
         definition = self.web_search(concept)
 
@@ -57,41 +141,65 @@ class SpiralAI:
         return "I don't have that knowledge yet. Teach me!"
 
     def save_memory(self):
-        """Saves learned knowledge."""
-        with open(self.memory_file, "w") as f:
-            json.dump(self.knowledge, f)
+        """Saves learned knowledge as a full snapshot (learn() only journals its changes)."""
+        self.journal.save({"concepts": self.knowledge, "explanations": self.explanations, "links": self.links})
 
     def load_memory(self):
         """Loads saved knowledge."""
-        try:
-            with open(self.memory_file, "r") as f:
-                self.knowledge = json.load(f)
-                print("🧠 Spiral Memory Loaded Successfully!")
-        except FileNotFoundError:
+        if self.journal.exists():
+            print("🧠 Spiral Memory Loaded Successfully!")
+        else:
             print("🔄 No memory found, starting fresh.")
+        root = self.journal.load()  # Snapshot plus any journaled changes
+        if root and not is_interned(root):
+            root = migrate_legacy_knowledge(root)
+            self.journal.save(root)
+        self.knowledge = root.get("concepts", {})
+        self.explanations = root.get("explanations", [])
+        self.links = root.get("links", {})
+        self.explanation_ids = index_explanations(self.explanations)
+        # Indexes are built on first use, so opening a large store stays cheap
+        self._word_index = self._substring_index = self._fuzzy_index = None
+
+    def rebuild_index(self):
+        """Rebuilds the concept indexes from scratch (after loading or bulk edits)."""
+        self._word_index = open_index(WordIndex, self.knowledge)
+        self._substring_index = open_index(SubstringIndex, self.knowledge)
+        self._fuzzy_index = None  # Rebuilt on the next recall miss
+
+    @property
+    def word_index(self):
+        if self._word_index is None:
+            self._word_index = open_index(WordIndex, self.knowledge)
+        return self._word_index
+
+    @property
+    def substring_index(self):
+        if self._substring_index is None:
+            self._substring_index = open_index(SubstringIndex, self.knowledge)
+        return self._substring_index
+
+    @property
+    def fuzzy_index(self):
+        # Only needed when recall misses, so it is built on the first miss
+        if self._fuzzy_index is None:
+            self._fuzzy_index = open_index(FuzzyIndex, self.knowledge)
+        return self._fuzzy_index
 
     ### 🔄 SPIRAL LEARNING & REASONING ###
     
     def reinforce_connections(self, concept):
         """Strengthens links between related knowledge in a spiral structure."""
         if concept in self.knowledge:
-            for existing_concept in self.knowledge:
-                if concept in existing_concept or existing_concept in concept:
-                    self.knowledge[existing_concept].append(f"Linked to {concept}. Expands on: {random.choice(self.knowledge[concept])}")
+            # Concepts containing this one, or contained in it
+            for existing_concept in self.substring_index.related(concept):
+                if existing_concept != concept:
+                    self.add_link(existing_concept, concept, "linked")
 
     def find_related_concepts(self, concept):
         """Finds other concepts that spiral out from the given concept."""
-        related = []
-        concept_words = concept.split()
-
-        for key in self.knowledge.keys():
-            key_words = key.split()
-            
-            # If they share words (like "Ecosystem" and "Environment"), treat them as related
-            if any(word in key_words for word in concept_words):
-                related.append(key)
-
-        return related
+        # If they share words (like "Climate Change" and "Climate Science"), treat them as related
+        return self.word_index.related(concept)
 
     def expand_reasoning(self, base_concept, linked_concepts, depth=0):
         """Simulates complex reasoning by spiraling outward through linked knowledge."""
@@ -103,7 +211,7 @@ class SpiralAI:
         spiral_thoughts = []
         for concept in linked_concepts:
             if concept in self.knowledge:
-                explanations = self.knowledge[concept]
+                explanations = self.explanations_of(concept)
                 sampled_explanations = random.sample(explanations, min(2, len(explanations)))  
                 for exp in sampled_explanations:
                     if exp not in spiral_thoughts:  
@@ -115,19 +223,14 @@ class SpiralAI:
     
     def web_search(self, query):
         """Fetches knowledge from Wikipedia with better error handling."""
-        wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{query}"
-        headers = {"User-Agent": "SpiralAI/1.0"}
-
         try:
-            response = requests.get(wiki_url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("extract", "")
-                return summary if summary else "I couldn't find detailed info, but you can check Wikipedia."
-        except requests.exceptions.RequestException:
+            summary = self.fetcher.search(query)
+        except FetchError:
             return "Error: Couldn't connect to Wikipedia."
 
-        return "I couldn't find anything on that topic."
+        if summary is None:
+            return "I couldn't find anything on that topic."
+        return summary if summary else "I couldn't find detailed info, but you can check Wikipedia."
 
     ### 🧠 CONTEXTUAL CONVERSATION MEMORY ###
     
@@ -137,6 +240,25 @@ class SpiralAI:
             self.session_memory.pop(0)
         self.session_memory.append(user_input)
 
+    def correct_command(self, user_input):
+        """
+        Rewrites a leading command missing one letter ("defin", "wat is") to its proper spelling.
+        Only dropped letters are fixed: a substitution would also turn "refine ..." or
+        "what if ..." into commands that search the web and learn the result.
+        """
+        words = user_input.split()
+        for command in COMMANDS:
+            size = len(command.split())
+            head = " ".join(words[:size]).lower()
+            if len(words) > size and len(head) == len(command) - 1 and self.is_subsequence(head, command):
+                return f"{command} {' '.join(words[size:])}"
+        return user_input
+
+    @staticmethod
+    def is_subsequence(short, text):
+        letters = iter(text)
+        return all(letter in letters for letter in short)
+
     def contextual_response(self, user_input):
         """Generates a response based on recent conversations."""
         for past_input in reversed(self.session_memory):
@@ -164,9 +286,8 @@ class SpiralAI:
 
             self.update_session_memory(user_input)
 
-            # Handle typos like "defin" instead of "define"
-            if user_input.lower().startswith("defin "):
-                user_input = "define " + user_input[len("defin "):]
+            # Handle typos in the command itself, like "defin" or "wat is"
+            user_input = self.correct_command(user_input)
 
             context_response = self.contextual_response(user_input)
             if context_response:
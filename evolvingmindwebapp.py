@@ -1,15 +1,35 @@
-from flask import Flask, request, jsonify, render_template
-import json
-import requests
+from flask import Flask, Response, stream_with_context, request, jsonify, render_template
+import os
 import random
+import sys
+
+from chat_asgi import BAD_BATCH, ChatServer, batch_messages, ndjson_results, serve
+from knowledge_graph import LINK_TEMPLATES, SECTIONS, index_explanations, is_interned, migrate_legacy_knowledge
+from knowledge_index import FuzzyIndex, SubstringIndex, WordIndex
+from knowledge_store import open_index, open_knowledge
+from response_cache import ResponseCache
+from session_store import SESSION_COOKIE, ReadWriteLock, SessionStore
+from web_fetch import FetchError, WebFetcher
 
 app = Flask(__name__)
 
 class SpiralAI:
-    def __init__(self, memory_file="spiral_memory.json"):
+    def __init__(self, memory_file="spiral_memory.json", fetcher=None, response_cache=None):
         self.memory_file = memory_file
-        self.knowledge = {}
-        self.session_memory = []
+        # Candidate sets rather than strings, so repeated questions keep their random variety
+        self.response_cache = response_cache if response_cache is not None else ResponseCache(cache_candidates=True)
+        self.version = 0  # Bumped by every change to the knowledge, invalidating cached answers
+        self.fetcher = fetcher or WebFetcher()
+        self.journal = open_knowledge(memory_file, sections=SECTIONS)
+        self.knowledge = {}  # Concept -> ids of its explanations
+        self.explanations = []  # Interned explanation texts, same layout as evolvingmindimprovedversion
+        self.explanation_ids = {}
+        self.links = {}  # Concept -> {linked concept: link kind}
+        self.sessions = SessionStore(history=5)  # Recent messages of each client
+        self.lock = ReadWriteLock()  # Server threads share one knowledge base
+        self._word_index = None
+        self._substring_index = None
+        self._fuzzy_index = None
         self.load_memory()
 
     ### 🌟 MEMORY FUNCTIONS ###
@@ -17,95 +37,203 @@ class SpiralAI:
     def learn(self, concept, explanation):
         """Learns and stores concepts permanently."""
         concept = concept.upper()
-        if concept in self.knowledge:
-            self.knowledge[concept].append(explanation)
-        else:
-            self.knowledge[concept] = [explanation]
-        self.reinforce_connections(concept)
-        self.save_memory()
+        with self.lock.write():
+            if concept not in self.knowledge:
+                self.index_concept(concept)
+            self.add_explanation(concept, explanation)
+            self.reinforce_connections(concept)
+            self.version += 1
+
+    def learn_many(self, pairs):
+        """
+        Learns (concept, explanation) pairs from any iterable, linking the new
+        concepts in one pass and persisting everything together at the end.
+        :return: Number of pairs learned.
+        """
+        learned = []  # Concept of each pair, in arrival order
+        arrival = {}  # New concept -> position of its first pair
+        with self.lock.write(), self.journal.batch():
+            for concept, explanation in pairs:
+                concept = concept.upper()
+                if concept not in self.knowledge:
+                    arrival[concept] = len(learned)
+                    self.index_concept(concept)
+                self.add_explanation(concept, explanation)
+                learned.append(concept)
+            for position, concept in enumerate(learned):
+                for existing_concept in self.substring_index.related(concept):
+                    if existing_concept != concept and arrival.get(existing_concept, -1) <= position:
+                        self.add_link(existing_concept, concept, "linked")
+            self.version += 1
+        return len(learned)
+
+    def index_concept(self, concept):
+        """Adds a new concept to the lookup indexes (to the fuzzy index only once it is in use)."""
+        self.word_index.add(concept)
+        self.substring_index.add(concept)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(concept)
+
+    def add_explanation(self, concept, explanation):
+        """Attaches an explanation to a concept, storing its text only once."""
+        explanation_id = self.explanation_ids.get(explanation)
+        if explanation_id is None:
+            explanation_id = self.explanation_ids[explanation] = len(self.explanations)
+            self.journal.append(["explanations"], explanation_id, explanation)
+            self.explanations.append(explanation)
+        references = self.knowledge.setdefault(concept, [])
+        if explanation_id not in references:
+            self.journal.append(["concepts", concept], len(references), explanation_id)
+            references.append(explanation_id)
+
+    def add_link(self, concept, other, kind):
+        """Records a link edge from concept to other."""
+        links = self.links.setdefault(concept, {})
+        if links.get(other) != kind:
+            links[other] = kind
+            self.journal.set(["links", concept, other], kind)
+
+    def explanations_of(self, concept):
+        return [self.explanations[explanation_id] for explanation_id in self.knowledge[concept]]
 
     def recall(self, concept):
         """Retrieves learned knowledge and expands on it."""
         concept = concept.upper()
-        if concept in self.knowledge:
-            responses = list(set(self.knowledge[concept]))  
-            linked_concepts = self.find_related_concepts(concept)
-            reasoning = self.expand_reasoning(concept, linked_concepts)
-            return f"{random.choice(responses)} {reasoning}" 
-        return self.web_search(concept)
+        with self.lock.read():
+            answer = self.response_cache.lookup(concept, self.version, lambda: self.answer_candidates(concept),
+                                                self.compose_answer)
+        if answer is not None:
+            return answer
+        return self.web_search(concept)  # Learning takes the write lock, so search outside the read lock
+
+    def answer_candidates(self, concept):
+        """
+        Gathers what recall picks its answer from at random (caller holds the read lock).
+        :return: (prefix, concept, explanations, (linked concept, kind, its explanations) per link,
+                  explanations of each related concept or None), or None if the concept is unknown.
+        """
+        prefix = ""
+        if concept not in self.knowledge:
+            suggestion = self.fuzzy_index.best(concept)
+            if not suggestion:
+                return None
+            prefix, concept = f"Did you mean {suggestion}? ", suggestion
+        links = [(other, kind, self.explanations_of(other)) for other, kind in self.links.get(concept, {}).items()]
+        linked_concepts = self.find_related_concepts(concept)
+        related = [self.explanations_of(c) for c in linked_concepts if c in self.knowledge] if linked_concepts else None
+        return prefix, concept, self.explanations_of(concept), links, related
+
+    def compose_answer(self, candidates):
+        """Picks one explanation or link uniformly and expands on the related concepts."""
+        prefix, concept, explanations, links, related = candidates
+        pick = random.randrange(len(explanations) + len(links))
+        if pick < len(explanations):
+            response = explanations[pick]
+        else:
+            other, kind, other_explanations = links[pick - len(explanations)]
+            response = LINK_TEMPLATES[kind].format(other, random.choice(other_explanations))
+        reasoning = self.compose_reasoning(concept, related) if related is not None else ""
+        return f"{prefix}{response} {reasoning}" 
 
     def save_memory(self):
-        """Saves knowledge to file."""
-        with open(self.memory_file, "w") as f:
-            json.dump(self.knowledge, f)
+        """Saves knowledge to file as a full snapshot."""
+        with self.lock.write():
+            self.journal.save({"concepts": self.knowledge, "explanations": self.explanations, "links": self.links})
 
     def load_memory(self):
         """Loads saved knowledge from file."""
-        try:
-            with open(self.memory_file, "r") as f:
-                self.knowledge = json.load(f)
-        except FileNotFoundError:
-            self.knowledge = {}
+        with self.lock.write():
+            root = self.journal.load()
+            if root and not is_interned(root):
+                root = migrate_legacy_knowledge(root)
+                self.journal.save(root)
+            self.knowledge = root.get("concepts", {})
+            self.explanations = root.get("explanations", [])
+            self.links = root.get("links", {})
+            self.explanation_ids = index_explanations(self.explanations)
+            self._word_index = self._substring_index = self._fuzzy_index = None  # Built on first use
+            self.version += 1
+
+    def rebuild_index(self):
+        """Rebuilds the concept indexes from the loaded knowledge."""
+        self._word_index = open_index(WordIndex, self.knowledge)
+        self._substring_index = open_index(SubstringIndex, self.knowledge)
+        self._fuzzy_index = None
+
+    @property
+    def word_index(self):
+        if self._word_index is None:
+            self._word_index = open_index(WordIndex, self.knowledge)
+        return self._word_index
+
+    @property
+    def substring_index(self):
+        if self._substring_index is None:
+            self._substring_index = open_index(SubstringIndex, self.knowledge)
+        return self._substring_index
+
+    @property
+    def fuzzy_index(self):
+        # Only needed when recall misses, so it is built on the first miss
+        if self._fuzzy_index is None:
+            self._fuzzy_index = open_index(FuzzyIndex, self.knowledge)
+        return self._fuzzy_index
 
     ### 🔄 SPIRAL LEARNING & REASONING ###
     
     def reinforce_connections(self, concept):
         """Strengthens knowledge by linking related concepts."""
         if concept in self.knowledge:
-            for existing_concept in self.knowledge:
-                if concept in existing_concept or existing_concept in concept:
-                    self.knowledge[existing_concept].append(f"Linked to {concept}. Expands on: {random.choice(self.knowledge[concept])}")
+            for existing_concept in self.substring_index.related(concept):
+                if existing_concept != concept:
+                    self.add_link(existing_concept, concept, "linked")
 
     def find_related_concepts(self, concept):
         """Finds related topics based on stored knowledge."""
-        related = []
-        concept_words = concept.split()
-        for key in self.knowledge.keys():
-            key_words = key.split()
-            if any(word in key_words for word in concept_words):
-                related.append(key)
-        return related
+        return self.word_index.related(concept)
 
     def expand_reasoning(self, base_concept, linked_concepts, depth=0):
         """Expands on related concepts dynamically."""
         if not linked_concepts or depth >= 2:
             return ""
+        related = [self.explanations_of(concept) for concept in linked_concepts if concept in self.knowledge]
+        return self.compose_reasoning(base_concept, related)
+
+    @staticmethod
+    def compose_reasoning(base_concept, related):
+        """Samples up to two distinct thoughts from the related concepts' explanations."""
         reasoning = f"🔗 Connected to {base_concept}: "
         spiral_thoughts = []
-        for concept in linked_concepts:
-            if concept in self.knowledge:
-                explanations = self.knowledge[concept]
-                sampled_explanations = random.sample(explanations, min(2, len(explanations)))  
-                for exp in sampled_explanations:
-                    if exp not in spiral_thoughts:
-                        spiral_thoughts.append(exp)
+        for explanations in related:
+            sampled_explanations = random.sample(explanations, min(2, len(explanations)))  
+            for exp in sampled_explanations:
+                if exp not in spiral_thoughts:
+                    spiral_thoughts.append(exp)
+            if len(spiral_thoughts) >= 2:
+                break  # Later concepts could only add thoughts past the two that are shown
         return reasoning + " ".join(spiral_thoughts[:2])
 
     ### 🔍 WEB SEARCH ###
     
     def web_search(self, query):
         """Searches Wikipedia for missing knowledge."""
-        wiki_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{query}"
-        headers = {"User-Agent": "SpiralAI/1.0"}
         try:
-            response = requests.get(wiki_url, headers=headers, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                summary = data.get("extract", "")
-                if summary:
-                    self.learn(query.upper(), summary)
-                    return summary
-        except requests.exceptions.RequestException:
+            summary = self.fetcher.search(query)
+        except FetchError:
             return "Error: Couldn't connect to Wikipedia."
+        if summary:
+            self.learn(query.upper(), summary)
+            return summary
         return "I couldn't find anything on that topic."
 
     ### 🌍 FLASK INTEGRATION ###
     
-    def chat_response(self, user_input):
-        """Processes user queries and responds."""
-        self.session_memory.append(user_input)
-        if len(self.session_memory) > 5:
-            self.session_memory.pop(0)
+    def chat_response(self, user_input, session_id="local"):
+        """
+        Processes user queries and responds.
+        :param session_id: Client whose conversation context the message belongs to.
+        """
+        self.sessions.remember(session_id, user_input)
 
         if user_input.lower().startswith("define "):
             concept = user_input[len("define "):].strip()
@@ -118,9 +246,18 @@ class SpiralAI:
 
         return "I am still learning! Try asking 'Define Quantum Computing' or 'What is Gravity'."
 
+    def needs_lookup(self, user_input):
+        """Whether chat_response may search the web for this message (a cheap check, no locking)."""
+        text = user_input.lower()
+        if text.startswith("define "):
+            return True
+        if text.startswith("what is "):
+            return user_input[len("what is "):].strip().upper() not in self.knowledge
+        return False
+
 
 # 🚀 Initialize Spiral AI
-ai = SpiralAI()
+ai = SpiralAI(os.environ.get("SPIRAL_MEMORY_FILE", "spiral_memory.json"))  # e.g. a .db store for fast worker startup
 
 @app.route("/")
 def home():
@@ -128,9 +265,29 @@ def home():
 
 @app.route("/chat", methods=["POST"])
 def chat():
-    user_message = request.json["message"]
-    response = ai.chat_response(user_message)
-    return jsonify({"response": response})
+    data = request.json
+    session_id = data.get("session_id") or request.cookies.get(SESSION_COOKIE) or SessionStore.new_id()
+    response = jsonify({"response": ai.chat_response(data["message"], session_id)})
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="Lax")
+    return response
+
+@app.route("/chat/batch", methods=["POST"])
+def chat_batch():
+    """Answers a list of messages, streaming one JSON line per message as it completes."""
+    data = request.get_json(silent=True)
+    messages = batch_messages(data)
+    if messages is None:
+        return Response(BAD_BATCH, status=400, mimetype="application/json")
+    session_id = (data.get("session_id") if isinstance(data, dict) else None) or request.cookies.get(SESSION_COOKIE) or SessionStore.new_id()
+    response = Response(stream_with_context(ndjson_results(ai.chat_response, messages, session_id)), mimetype="application/x-ndjson")
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="Lax")
+    return response
+
+# ⚡ Async serving: uvicorn evolvingmindwebapp:asgi_app (or python evolvingmindwebapp.py --asgi)
+asgi_app = ChatServer(ai.chat_response, app, needs_lookup=ai.needs_lookup, sessions=ai.sessions)
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    if "--asgi" in sys.argv:
+        serve(asgi_app)
+    else:
+        app.run(debug=True)
@@ -0,0 +1,69 @@
+import argparse
+import csv
+import importlib
+import json
+import time
+
+# Knowledge bases that support learn_many, by command-line name
+TARGETS = {
+    "improved": ("evolvingmindimprovedversion", "SpiralAI", "spiral_memory.json"),
+    "webapp": ("evolvingmindwebapp", "SpiralAI", "spiral_memory.json"),
+    "app": ("app", "SpiralAI", "memory.json"),
+    "numerical": ("evolved_mind_numerical_and_verbal", "SpiralAI", "memory.json"),
+    "master": ("EvolvingMind_AI", "MasterAI", "master_memory.json"),
+}
+HEADER_NAMES = {"term", "concept", "word"}
+TERM_KEYS = ("term", "concept", "word")
+DEFINITION_KEYS = ("definition", "explanation", "meaning")
+
+def read_csv(path):
+    """Yields (term, definition) from the first two columns, skipping a header row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for number, row in enumerate(csv.reader(f)):
+            if number == 0 and row and row[0].strip().lower() in HEADER_NAMES:
+                continue
+            if len(row) >= 2 and row[0].strip():
+                yield row[0].strip(), row[1].strip()
+
+def read_jsonl(path):
+    """Yields (term, definition) from JSON lines: {"term": ..., "definition": ...} objects or [term, definition] pairs."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                term = next((entry[key] for key in TERM_KEYS if key in entry), None)
+                definition = next((entry[key] for key in DEFINITION_KEYS if key in entry), None)
+                if term is None or definition is None:
+                    raise ValueError(f"{path}, line {number}: expected a term key ({', '.join(TERM_KEYS)}) "
+                                     f"and a definition key ({', '.join(DEFINITION_KEYS)})")
+            elif isinstance(entry, list) and len(entry) == 2:
+                term, definition = entry
+            else:
+                raise ValueError(f"{path}, line {number}: expected an object or a [term, definition] pair")
+            yield term, definition
+
+def import_glossary(path, target="improved", memory_file=None, file_format=None):
+    """
+    Streams a CSV/JSONL glossary into a knowledge base with learn_many.
+    :return: (terms learned, seconds taken)
+    """
+    module_name, class_name, default_memory = TARGETS[target]
+    knowledge_base = getattr(importlib.import_module(module_name), class_name)(memory_file or default_memory)
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    pairs = read_jsonl(path) if file_format == "jsonl" else read_csv(path)
+    start = time.perf_counter()
+    count = knowledge_base.learn_many(pairs)
+    knowledge_base.journal.close()
+    return count, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import a glossary into a Spiral AI knowledge base.")
+    parser.add_argument("path", help="CSV (term,definition) or JSONL glossary file.")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="improved")
+    parser.add_argument("--memory-file", help="Memory file to import into (.json, or .db for the SQLite store).")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+    args = parser.parse_args()
+    count, seconds = import_glossary(args.path, args.target, args.memory_file, args.format)
+    print(f"✅ Imported {count} terms in {seconds:.2f}s ({count / max(seconds, 1e-9):,.0f} terms/s)")
@@ -0,0 +1,52 @@
+import re
+
+# Sections of the interned layout, and whether each is stored as a dict or a list
+SECTIONS = {"concepts": dict, "explanations": list, "links": dict}
+
+# How each kind of link between two concepts reads when recalled
+LINK_TEMPLATES = {
+    "related": "Related to {}: {}",
+    "connected": "Connected to {}: {}",
+    "linked": "Linked to {}. Expands on: {}",
+}
+LEGACY_LINK_PATTERNS = [
+    ("related", re.compile(r"Related to (.+?): ")),
+    ("connected", re.compile(r"Connected to (.+?): ")),
+    ("linked", re.compile(r"Linked to (.+?)\. Expands on: ")),
+]
+
+def is_interned(root):
+    """True if a loaded memory file already uses the concepts/explanations/links layout."""
+    # Legacy concept keys are upper-case, so they never collide with these lower-case sections
+    return set(root) <= set(SECTIONS)
+
+def index_explanations(explanations):
+    """Returns an explanation text -> id lookup; lazy store tables answer it from their database."""
+    if hasattr(explanations, "positions"):
+        return explanations.positions()
+    return {text: explanation_id for explanation_id, text in enumerate(explanations)}
+
+def migrate_legacy_knowledge(legacy):
+    """
+    Converts the old {concept: [strings]} memory into the interned layout.
+    Synthesized "Related to/Connected to/Linked to" strings become link edges;
+    every other string is stored once in the explanation table.
+    """
+    root = {"concepts": {}, "explanations": [], "links": {}}
+    ids = {}
+    for concept, strings in legacy.items():
+        references = root["concepts"].setdefault(concept, [])
+        for text in strings:
+            for kind, pattern in LEGACY_LINK_PATTERNS:
+                match = pattern.match(text)
+                if match and match.group(1) in legacy:
+                    if match.group(1) != concept:
+                        root["links"].setdefault(concept, {})[match.group(1)] = kind
+                    break
+            else:
+                if text not in ids:
+                    ids[text] = len(root["explanations"])
+                    root["explanations"].append(text)
+                if ids[text] not in references:
+                    references.append(ids[text])
+    return root
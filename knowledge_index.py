@@ -0,0 +1,236 @@
+import bisect
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+class WordIndex:
+    """
+    Inverted index from each word to the concepts containing it.
+    Answers "which stored concepts share a word with X" with one lookup per word
+    of X, instead of splitting every stored concept on every call.
+    Concepts are kept in insertion order per word (dicts used as ordered sets).
+    """
+
+    def __init__(self, concepts=()):
+        self.concepts_by_word = defaultdict(dict)
+        for concept in concepts:
+            self.add(concept)
+
+    def add(self, concept):
+        for word in concept.split():
+            self.concepts_by_word[word][concept] = None
+
+    def discard(self, concept):
+        for word in concept.split():
+            concepts = self.concepts_by_word.get(word)
+            if concepts is not None:
+                concepts.pop(concept, None)
+                if not concepts:
+                    del self.concepts_by_word[word]
+
+    def related(self, concept):
+        """Returns the stored concepts sharing at least one word with concept."""
+        related = {}
+        for word in concept.split():
+            concepts = self.concepts_by_word.get(word)
+            if concepts:
+                related.update(concepts)
+        return list(related)
+
+class SubstringIndex:
+    """
+    Substring containment index over concept names, maintained incrementally.
+    contained_in(text) walks a character trie of the stored names from every
+    position of text (the goto trie of an Aho-Corasick automaton, kept without
+    failure links so inserts stay O(len(name))), costing O(len(text) x longest
+    match) whatever the number of stored concepts. containing(text) intersects
+    the posting sets of the text's rarest character trigrams and verifies the few
+    survivors, so its cost follows the candidate count rather than the store size.
+    Texts shorter than a trigram (e.g. "AI") have exact postings of their own.
+    Results come in insertion order, so they do not depend on hash randomization.
+    """
+
+    GRAM = 3
+
+    def __init__(self, concepts=()):
+        self.trie = {}
+        self.concepts_by_gram = defaultdict(set)  # Trigrams, plus every shorter substring
+        self.concepts = {}  # Concept -> insertion number
+        for concept in concepts:
+            self.add(concept)
+
+    def _grams(self, text):
+        return {text[i:i + self.GRAM] for i in range(len(text) - self.GRAM + 1)}
+
+    @classmethod
+    def _short_grams(cls, text):
+        return {text[i:i + size] for size in range(1, cls.GRAM) for i in range(len(text) - size + 1)}
+
+    def add(self, concept):
+        node = self.trie
+        for char in concept:
+            node = node.setdefault(char, {})
+        node[None] = concept  # None marks the end of a stored name
+        self.concepts.setdefault(concept, len(self.concepts))
+        for gram in self._grams(concept) | self._short_grams(concept):
+            self.concepts_by_gram[gram].add(concept)
+
+    def contained_in(self, text):
+        """Returns the stored concepts that occur inside text."""
+        found = {}
+        for start in range(len(text)):
+            node = self.trie
+            for char in text[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if None in node:
+                    found[node[None]] = None
+        return list(found)
+
+    def containing(self, text):
+        """Returns the stored concepts that contain text."""
+        if not text:
+            return list(self.concepts)
+        if len(text) < self.GRAM:
+            return sorted(self.concepts_by_gram.get(text, ()), key=self.concepts.__getitem__)
+        postings = sorted((self.concepts_by_gram.get(gram, ()) for gram in self._grams(text)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:3]:
+            if len(candidates) <= 1:
+                break
+            candidates = candidates & posting
+        return sorted((concept for concept in candidates if text in concept), key=self.concepts.__getitem__)
+
+    def related(self, concept):
+        """Returns stored concepts that contain concept or are contained in it."""
+        return list(dict.fromkeys(self.containing(concept) + self.contained_in(concept)))
+
+def bounded_edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or None once it is certain to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    # Only cells within `limit` of the diagonal can stay under the limit
+    beyond = limit + 1
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        current = [i if i <= limit else beyond] + [beyond] * len(b)
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+        if min(current[low - 1:high + 1]) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup of concept names by edit distance.
+    Names are split into padded character trigrams with compact integer posting
+    lists. An edit changes at most three trigrams, so a name within distance k of
+    the query shares all but 3k of its trigrams, and must therefore appear in one
+    of the query's 3k + 1 rarest posting lists. Only those candidates are counted
+    and verified with a bounded edit distance, never the whole key set.
+    """
+
+    GRAM = 3
+    PAD = "\0" * (GRAM - 1)
+
+    def __init__(self, concepts=()):
+        self.concepts = []
+        self.lengths = array("I")  # Per concept id, for cheap vectorised filters
+        self.gram_counts = array("I")
+        self.postings = {}
+        for concept in concepts:
+            self.add(concept)
+
+    @classmethod
+    def _grams(cls, text):
+        padded = cls.PAD + text + cls.PAD
+        return {padded[i:i + cls.GRAM] for i in range(len(padded) - cls.GRAM + 1)}
+
+    def add(self, concept):
+        concept_id = len(self.concepts)
+        grams = self._grams(concept)
+        self.concepts.append(concept)
+        self.lengths.append(len(concept))
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("I")
+            posting.append(concept_id)
+
+    @staticmethod
+    def tolerance(text):
+        """Edits allowed for a query: none for very short words, more for longer ones."""
+        return 0 if len(text) <= 2 else 1 if len(text) <= 6 else 2
+
+    def lookup(self, text, limit=3, max_distance=None):
+        """
+        Returns up to limit (concept, distance) pairs closest to text, nearest first.
+        The bound is widened one edit at a time and the search stops at the first
+        bound with any match: single typos are the common case, and a tight bound
+        leaves far fewer candidates to verify.
+        """
+        max_distance = self.tolerance(text) if max_distance is None else max_distance
+        matches = []
+        for limit_distance in range(min(1, max_distance), max_distance + 1):
+            matches = self._search(text, limit_distance, limit)
+            if matches:
+                break
+        return matches
+
+    def _search(self, text, limit_distance, limit):
+        """Returns the limit nearest (concept, distance) pairs within limit_distance of text."""
+        grams = self._grams(text)
+        needed = len(grams) - self.GRAM * limit_distance  # Trigrams a match must share
+        if needed <= 0:
+            return []
+        postings = sorted((np.frombuffer(self.postings[gram], dtype=np.uint32) for gram in grams
+                           if gram in self.postings), key=len)
+        if len(postings) < needed:
+            return []
+        # Count shared trigrams over all but the very common lists in one pass (ScanCount);
+        # every list left out lowers the count a candidate must already have reached
+        prefix = len(postings) - needed + 1
+        cutoff = max(len(postings[prefix - 1]), len(self.concepts) // 32)
+        selected = [posting for posting in postings if len(posting) <= cutoff]
+        excluded = postings[len(selected):]
+        counts = np.bincount(np.concatenate(selected), minlength=len(self.concepts))
+        candidates = np.flatnonzero(counts >= needed - len(excluded))
+        # A match is no more than limit_distance longer or shorter, and shares all
+        # but 3 x limit_distance of its own trigrams as well
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)[candidates].astype(np.int64)
+        candidates = candidates[np.abs(lengths - len(text)) <= limit_distance]
+        shared = counts[candidates]
+        own_grams = np.frombuffer(self.gram_counts, dtype=np.uint32)[candidates].astype(np.int64)
+        own_needed = np.maximum(own_grams - self.GRAM * limit_distance, needed)
+        # Common lists are sorted too, so membership there is a binary search per candidate
+        for done, posting in enumerate(excluded, 1):
+            positions = np.searchsorted(posting, candidates).clip(max=len(posting) - 1)
+            shared = shared + (posting[positions] == candidates)
+            keep = shared + (len(excluded) - done) >= own_needed
+            candidates, shared, own_needed, own_grams = (
+                candidates[keep], shared[keep], own_needed[keep], own_grams[keep])
+        keep = shared >= own_needed
+        candidates, shared, own_grams = candidates[keep], shared[keep], own_grams[keep]
+        # Each edit costs at most 3 shared trigrams, which bounds the distance from below;
+        # verifying in that order lets the scan stop once nothing left can rank higher
+        lower_bounds = -((shared - np.maximum(own_grams, len(grams))) // self.GRAM)
+        order = np.argsort(lower_bounds, kind="stable")
+        matches = []
+        for lower_bound, concept_id in zip(lower_bounds[order].tolist(), candidates[order].tolist()):
+            if len(matches) >= limit and lower_bound > matches[limit - 1][0]:
+                break
+            concept = self.concepts[concept_id]
+            distance = bounded_edit_distance(text, concept, limit_distance)
+            if distance is not None:
+                bisect.insort(matches, (distance, concept))
+        return [(concept, distance) for distance, concept in matches[:limit]]
+
+    def best(self, text):
+        """Returns the closest stored concept to text, or None if nothing is close enough."""
+        matches = self.lookup(text, limit=1)
+        return matches[0][0] if matches else None
@@ -0,0 +1,250 @@
+import atexit
+import contextlib
+import glob
+import json
+import os
+import threading
+import time
+import weakref
+
+_live_journals = weakref.WeakSet()  # Closed at exit, without keeping each journal alive until then
+
+@atexit.register
+def _close_journals():
+    for journal in list(_live_journals):
+        journal.close()
+
+class KnowledgeJournal:
+    """
+    Append-only persistence for the knowledge bases.
+    The memory file stays a plain JSON snapshot; each mutation is appended as one
+    JSON line to "<memory file>.journal", so a learn() costs I/O proportional to
+    the change instead of rewriting the whole file. Writes are flushed at once and
+    fsynced in batches. Once the journal grows past compact_after records it is
+    rotated and folded into the snapshot on a background thread.
+
+    Records address values by path from the root object:
+      ["set", path, value]           root[path...] = value
+      ["append", path, index, value] appends value to the list at path, unless the
+                                     list already holds index + 1 items
+    Both are idempotent, so replaying a record the snapshot already contains is
+    harmless and a crash at any point during compaction loses nothing.
+    """
+
+    def __init__(self, snapshot_file, indent=None, sync_every=64, sync_interval=1.0, compact_after=10000):
+        """
+        :param snapshot_file: The JSON memory file.
+        :param indent: JSON indent used when writing the snapshot.
+        :param sync_every: fsync after this many records...
+        :param sync_interval: ...or once this many seconds passed since the last fsync.
+        :param compact_after: Records in the live journal before a background compaction.
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + ".journal"
+        self.indent = indent
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self._file = None
+        self._records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compaction = None
+        self._buffer = None  # Lines held back while a batch() is open
+        _live_journals.add(self)
+
+    ### 📖 LOADING ###
+
+    def exists(self):
+        return os.path.exists(self.snapshot_file) or bool(self._journal_files())
+
+    def load(self):
+        """Returns the snapshot with every journal record replayed on top ({} if none)."""
+        self._wait_for_compaction()
+        try:
+            with open(self.snapshot_file, "r") as f:
+                root = json.load(f)
+        except FileNotFoundError:
+            root = {}
+        for path in self._journal_files():
+            self._replay(root, path)
+        return root
+
+    def _segments(self):
+        """Rotated journal segments awaiting compaction, oldest first."""
+        segments = glob.glob(glob.escape(self.journal_file) + ".*")
+        return sorted((path for path in segments if path.rsplit(".", 1)[1].isdigit()),
+                      key=lambda path: int(path.rsplit(".", 1)[1]))
+
+    def _journal_files(self):
+        return self._segments() + ([self.journal_file] if os.path.exists(self.journal_file) else [])
+
+    @staticmethod
+    def _replay(root, path):
+        with open(path, "rb") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if not line.endswith(b"\n"):
+                        break  # Torn final write from a crash; _open() cuts it off before appending
+                    print(f"⚠️ Skipping unreadable record on line {number} of {path}")
+                    continue
+                KnowledgeJournal.apply(root, record)
+
+    @staticmethod
+    def apply(root, record):
+        """Applies one journal record to a loaded root object."""
+        op, path = record[0], record[1]
+        container = root
+        for key in path[:-1]:
+            container = container.setdefault(key, {})
+        if op == "set":
+            container[path[-1]] = record[2]
+        elif op == "append":
+            values = container.setdefault(path[-1], [])
+            if len(values) <= record[2]:
+                values.append(record[3])
+
+    ### ✍️ RECORDING ###
+
+    def set(self, path, value):
+        self._write(["set", path, value])
+
+    def append(self, path, index, value):
+        self._write(["append", path, index, value])
+
+    def _open(self):
+        if self._file is None:
+            if os.path.exists(self.journal_file):
+                self._end_last_line()
+            self._file = open(self.journal_file, "a", encoding="utf-8")
+
+    def _end_last_line(self):
+        """Makes the live journal end on a complete line, so the next record gets a line of its own."""
+        with open(self.journal_file, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            start = end
+            while start:  # Walk back to the start of the unterminated last line
+                step = min(4096, start)
+                f.seek(start - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    start += newline + 1 - step
+                    break
+                start -= step
+            f.seek(start)
+            try:
+                json.loads(f.read())
+            except ValueError:
+                f.truncate(start)  # Torn mid-record by a crash: replay already ignores it
+            else:
+                f.write(b"\n")  # Torn just before its newline: the record is whole, so keep it
+
+    def _write(self, record):
+        if self._buffer is not None:
+            self._buffer.append(json.dumps(record) + "\n")
+            return
+        self._flush_lines([json.dumps(record) + "\n"])
+
+    def _flush_lines(self, lines):
+        self._open()
+        self._file.write("".join(lines))
+        self._file.flush()
+        self._records += len(lines)
+        self._unsynced += len(lines)
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        if self._records >= self.compact_after:
+            self.compact()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Holds records back and writes them with a single write (and fsync) on exit."""
+        self._buffer = []
+        try:
+            yield self
+        finally:
+            lines, self._buffer = self._buffer, None
+            if lines:
+                self._flush_lines(lines)
+                self.sync()
+
+    def sync(self):
+        """Forces journaled records to disk."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    ### 🗜️ COMPACTION ###
+
+    def compact(self, wait=False):
+        """Rotates the live journal and folds it into the snapshot in the background."""
+        self._wait_for_compaction()
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.journal_file):
+            segments = self._segments()
+            number = int(segments[-1].rsplit(".", 1)[1]) + 1 if segments else 1
+            os.replace(self.journal_file, f"{self.journal_file}.{number}")
+        self._records = 0
+        self._compaction = threading.Thread(target=self._fold_segments, daemon=True)
+        self._compaction.start()
+        if wait:
+            self._wait_for_compaction()
+
+    def _fold_segments(self):
+        segments = self._segments()
+        if not segments:
+            return
+        try:
+            with open(self.snapshot_file, "r") as f:
+                root = json.load(f)
+        except FileNotFoundError:
+            root = {}
+        for path in segments:
+            self._replay(root, path)
+        self._write_snapshot(root)
+        for path in segments:
+            os.remove(path)
+
+    def _write_snapshot(self, root):
+        temporary = self.snapshot_file + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(root, f, indent=self.indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_file)
+
+    def _wait_for_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def save(self, root):
+        """Writes the full current state as the snapshot and clears the journal."""
+        self._wait_for_compaction()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._write_snapshot(root)
+        for path in self._journal_files():
+            os.remove(path)
+        self._records = 0
+        self._unsynced = 0
+
+    def close(self):
+        """Syncs pending records and waits for any running compaction."""
+        self._wait_for_compaction()
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,507 @@
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+
+from knowledge_index import FuzzyIndex, SubstringIndex, WordIndex, bounded_edit_distance
+from knowledge_journal import KnowledgeJournal
+
+DATABASE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+class LazyTable(MutableMapping):
+    """
+    Dict-like view of one section of a SQLiteKnowledge store.
+    Values are decoded from the database the first time they are read and then
+    cached, so only the concepts a query touches are ever loaded. Assignments
+    update the cache; the store's set()/append() records write them through.
+    """
+
+    def __init__(self, store, section):
+        self.store = store
+        self.section = section
+        self.cache = {}
+
+    def __getitem__(self, key):
+        if key not in self.cache:
+            self.cache[key] = self.store._get(self.section, key)
+        return self.cache[key]
+
+    def __setitem__(self, key, value):
+        self.cache[key] = value
+
+    def __delitem__(self, key):
+        self.cache.pop(key, None)
+        self.store._delete(self.section, key)
+
+    def __contains__(self, key):
+        return key in self.cache or self.store._has(self.section, key)
+
+    def __iter__(self):
+        return iter(self.store._keys(self.section))
+
+    def __len__(self):
+        return self.store._count(self.section)
+
+class LazyList:
+    """
+    List-like view of a list section (one row per item, keyed by position).
+    Supports what the knowledge bases need: len(), indexing and append().
+    """
+
+    def __init__(self, store, section):
+        self.store = store
+        self.section = section
+        self.cache = {}
+        self.length = None
+
+    def __len__(self):
+        if self.length is None:
+            self.length = self.store._next_position(self.section)
+        return self.length
+
+    def __getitem__(self, position):
+        if position not in self.cache:
+            self.cache[position] = self.store._get(self.section, position)
+        return self.cache[position]
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def append(self, value):
+        self.cache[len(self)] = value
+        self.length += 1
+
+    def positions(self):
+        """Returns a value -> position lookup answered by the database."""
+        return LazyPositions(self)
+
+class LazyPositions:
+    """Reverse lookup for a LazyList, backed by an index on the stored values."""
+
+    def __init__(self, values):
+        self.values = values
+        self.cache = {}
+
+    def get(self, value, default=None):
+        if value not in self.cache:
+            position = self.values.store._find(self.values.section, value)
+            if position is None:
+                return default
+            self.cache[value] = position
+        return self.cache[value]
+
+    def __setitem__(self, value, position):
+        self.cache[value] = position
+
+class SQLiteWordIndex(WordIndex):
+    """WordIndex over a LazyTable, answered from the store's concept_words table."""
+
+    def __init__(self, store, section):
+        self.store = store
+        self.section = section
+        store._index_section(section)
+
+    def add(self, concept):
+        self.store._add_postings(self.section, concept)
+
+    def related(self, concept):
+        """Returns the stored concepts sharing at least one word with concept."""
+        related = {}
+        for word in concept.split():
+            related.update(dict.fromkeys(self.store._column(
+                "SELECT concept FROM concept_words WHERE section = ? AND word = ? ORDER BY rowid",
+                (self.section, word))))
+        return list(related)
+
+class SQLiteSubstringIndex(SubstringIndex):
+    """
+    SubstringIndex over a LazyTable. containing() intersects the rarest trigram
+    postings kept in the store (shorter texts have postings of their own);
+    contained_in() looks every substring of the text up by primary key instead
+    of walking an in-memory trie. Results follow the stored keys' insertion order.
+    """
+
+    def __init__(self, store, section):
+        self.store = store
+        self.section = section
+        store._index_section(section)
+
+    def add(self, concept):
+        self.store._add_postings(self.section, concept)
+
+    def contained_in(self, text):
+        """Returns the stored concepts that occur inside text."""
+        substrings = dict.fromkeys(text[start:end] for start in range(len(text))
+                                   for end in range(start + 1, len(text) + 1))
+        stored = self.store._key_order(self.section, list(substrings))
+        return [substring for substring in substrings if substring in stored]
+
+    def containing(self, text):
+        """Returns the stored concepts that contain text."""
+        if not text:
+            return self.store._keys(self.section)
+        if len(text) < self.GRAM:
+            candidates = self.store._concepts_with_grams(self.section, [text], every=True)
+        else:
+            grams = self._grams(text)
+            counts = self.store._gram_counts(self.section, grams)
+            if len(counts) < len(grams):
+                return []  # Some trigram of text occurs in no stored name
+            candidates = self.store._concepts_with_grams(self.section, sorted(counts, key=counts.get)[:3], every=True)
+        order = self.store._key_order(self.section, [concept for concept in candidates if text in concept])
+        return sorted(order, key=order.get)
+
+class SQLiteFuzzyIndex(FuzzyIndex):
+    """
+    FuzzyIndex over a LazyTable. Candidates come from the union of the query's
+    rarest trigram postings in the store (a name within the bound must be in
+    one of them) and are verified with a bounded edit distance.
+    """
+
+    def __init__(self, store, section):
+        self.store = store
+        self.section = section
+        store._index_section(section)
+
+    def add(self, concept):
+        self.store._add_postings(self.section, concept)
+
+    def _search(self, text, limit_distance, limit):
+        """Returns the limit nearest (concept, distance) pairs within limit_distance of text."""
+        grams = self._grams(text)
+        needed = len(grams) - self.GRAM * limit_distance  # Trigrams a match must share
+        if needed <= 0:
+            return []
+        counts = self.store._gram_counts(self.section, grams)
+        if len(counts) < needed:
+            return []
+        rarest = sorted(counts, key=counts.get)[:len(counts) - needed + 1]
+        matches = []
+        for concept in self.store._concepts_with_grams(self.section, rarest, every=False):
+            distance = bounded_edit_distance(text, concept, limit_distance)
+            if distance is not None:
+                matches.append((distance, concept))
+        matches.sort()
+        return [(concept, distance) for distance, concept in matches[:limit]]
+
+SQLITE_INDEXES = {WordIndex: SQLiteWordIndex, SubstringIndex: SQLiteSubstringIndex, FuzzyIndex: SQLiteFuzzyIndex}
+
+class SQLiteKnowledge:
+    """
+    SQLite-backed alternative to KnowledgeJournal with the same interface
+    (exists/load/set/append/save/close), selected by a .db/.sqlite memory file.
+    load() returns lazy views instead of decoding the whole knowledge base, so
+    opening is constant-time and memory follows the concepts actually used.
+    The word and trigram postings of the concept indexes (see open_index) live
+    in tables of their own, built once per section and then kept up to date.
+    Each set()/append() record rewrites only the row it touches; commits are
+    batched like the journal's fsyncs (WAL mode, so a crash loses at most the
+    last uncommitted batch and never corrupts the file).
+
+    Rows are (section, key, value-as-JSON). A flat store ({word: meaning}) uses the
+    section "". With sections, e.g. {"concepts": dict, "explanations": list}, the
+    first path element names the section and list sections keep one row per item.
+    """
+
+    def __init__(self, database_file, sections=None, commit_every=256, commit_interval=1.0):
+        """
+        :param database_file: The SQLite file.
+        :param sections: None for a flat store, else {section name: dict or list}.
+        :param commit_every: Commit after this many records...
+        :param commit_interval: ...or once this many seconds passed since the last commit.
+        """
+        self.database_file = database_file
+        self.sections = sections
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._connection = None
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        self._batching = False
+        self._indexed = set()  # Sections whose concept postings are known to be built
+
+    ### 📖 LOADING ###
+
+    def exists(self):
+        return os.path.exists(self.database_file)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            # Shared by Flask's request threads; every statement runs under self._lock
+            self._connection = sqlite3.connect(self.database_file, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            # The key column is untyped so list sections can use integer positions
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS knowledge "
+                "(section TEXT NOT NULL, key NOT NULL, value TEXT NOT NULL, PRIMARY KEY (section, key))")
+            for section, kind in (self.sections or {}).items():
+                if kind is list:
+                    self._connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS "knowledge_{section}_values" '
+                        f"ON knowledge (value) WHERE section = '{section}'")
+            # Postings of the concept indexes; concept_words keeps rowids for insertion order
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS concept_words "
+                "(section TEXT NOT NULL, word TEXT NOT NULL, concept TEXT NOT NULL, UNIQUE (section, word, concept))")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS concept_grams (section TEXT NOT NULL, gram TEXT NOT NULL, "
+                "concept TEXT NOT NULL, PRIMARY KEY (section, gram, concept)) WITHOUT ROWID")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS concept_gram_counts (section TEXT NOT NULL, gram TEXT NOT NULL, "
+                "count INTEGER NOT NULL, PRIMARY KEY (section, gram)) WITHOUT ROWID")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS indexed_sections (section TEXT PRIMARY KEY)")
+            self._connection.commit()
+        return self._connection
+
+    def load(self):
+        """Returns lazy views of the stored knowledge (a LazyTable, or a dict of section views)."""
+        if self.sections is None:
+            return LazyTable(self, "")
+        return {section: LazyList(self, section) if kind is list else LazyTable(self, section)
+                for section, kind in self.sections.items()}
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def _get(self, section, key):
+        rows = self._query("SELECT value FROM knowledge WHERE section = ? AND key = ?", (section, key))
+        if not rows:
+            raise KeyError(key)
+        return json.loads(rows[0][0])
+
+    def _has(self, section, key):
+        return bool(self._query("SELECT 1 FROM knowledge WHERE section = ? AND key = ?", (section, key)))
+
+    def _keys(self, section):
+        return [key for key, in self._query("SELECT key FROM knowledge WHERE section = ? ORDER BY rowid", (section,))]
+
+    def _count(self, section):
+        return self._query("SELECT COUNT(*) FROM knowledge WHERE section = ?", (section,))[0][0]
+
+    def _next_position(self, section):
+        last = self._query("SELECT MAX(key) FROM knowledge WHERE section = ?", (section,))[0][0]
+        return 0 if last is None else last + 1
+
+    def _find(self, section, value):
+        rows = self._query("SELECT key FROM knowledge WHERE section = ? AND value = ?", (section, json.dumps(value)))
+        return rows[0][0] if rows else None
+
+    def _delete(self, section, key):
+        with self._lock:
+            self.connection.execute("DELETE FROM knowledge WHERE section = ? AND key = ?", (section, key))
+
+    ### 🔍 CONCEPT INDEXES ###
+
+    def _column(self, sql, parameters=()):
+        return [value for value, in self._query(sql, parameters)]
+
+    def _index_section(self, section):
+        """Builds the postings of a section's keys the first time it is indexed; add() keeps them current."""
+        with self._lock:
+            if section in self._indexed:
+                return
+            connection = self.connection
+            if not connection.execute("SELECT 1 FROM indexed_sections WHERE section = ?", (section,)).fetchall():
+                for table in ("concept_words", "concept_grams", "concept_gram_counts"):
+                    connection.execute(f"DELETE FROM {table} WHERE section = ?", (section,))
+                keys = connection.execute("SELECT key FROM knowledge WHERE section = ? ORDER BY rowid", (section,))
+                while True:
+                    rows = keys.fetchmany(10000)
+                    if not rows:
+                        break
+                    self._insert_postings(section, [key for key, in rows])
+                connection.execute("INSERT INTO indexed_sections VALUES (?)", (section,))
+                self._commit()
+            self._indexed.add(section)
+
+    def _add_postings(self, section, concept):
+        grams = FuzzyIndex._grams(concept)
+        with self._lock:
+            # Each index adds the same concept, so only the first add writes
+            if not self.connection.execute("SELECT 1 FROM concept_grams WHERE section = ? AND gram = ? AND concept = ?",
+                                           (section, min(grams), concept)).fetchall():
+                self._insert_postings(section, [concept])
+
+    def _insert_postings(self, section, concepts):
+        words, grams, counts = [], [], {}
+        for concept in concepts:
+            words.extend((section, word, concept) for word in dict.fromkeys(concept.split()))
+            # Padded trigrams serve both indexes; 1- and 2-character substrings serve short texts
+            for gram in FuzzyIndex._grams(concept) | SubstringIndex._short_grams(concept):
+                grams.append((section, gram, concept))
+                counts[gram] = counts.get(gram, 0) + 1
+        connection = self.connection
+        connection.executemany("INSERT OR IGNORE INTO concept_words VALUES (?, ?, ?)", words)
+        connection.executemany("INSERT INTO concept_grams VALUES (?, ?, ?)", sorted(grams))  # In key order
+        connection.executemany("INSERT INTO concept_gram_counts VALUES (?, ?, ?) "
+                               "ON CONFLICT (section, gram) DO UPDATE SET count = count + excluded.count",
+                               ((section, gram, count) for gram, count in counts.items()))
+
+    def _gram_counts(self, section, grams):
+        """Returns {gram: number of concepts} for the grams that occur in the section."""
+        grams = list(grams)
+        return dict(self._query("SELECT gram, count FROM concept_gram_counts WHERE section = ? AND gram IN "
+                                f"({', '.join('?' * len(grams))})", [section] + grams))
+
+    def _concepts_with_grams(self, section, grams, every):
+        """Returns the concepts posted under every one of grams, or under any of them."""
+        select = "SELECT concept FROM concept_grams WHERE section = ? AND gram = ?"
+        sql = (" INTERSECT " if every else " UNION ").join([select] * len(grams))
+        return self._column(sql, [value for gram in grams for value in (section, gram)])
+
+    def _key_order(self, section, keys):
+        """Returns {key: rowid} for the keys stored in the section; rowids follow insertion order."""
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            found.update(self._query(f"SELECT key, rowid FROM knowledge WHERE section = ? AND key IN "
+                                     f"({', '.join('?' * len(chunk))})", [section] + chunk))
+        return found
+
+    ### ✍️ RECORDING ###
+
+    def set(self, path, value):
+        self._write(["set", path, value])
+
+    def append(self, path, index, value):
+        self._write(["append", path, index, value])
+
+    def _write(self, record):
+        path = record[1]
+        if self.sections is None:
+            section, key, rest = "", path[0], path[1:]
+        elif self.sections[path[0]] is list and len(path) == 1:
+            section, key, rest = path[0], record[2], None
+        else:
+            section, key, rest = path[0], path[1], path[2:]
+        with self._lock:
+            connection = self.connection
+            if rest is None:
+                # Appending to a list section adds one row; an existing row means it was already applied
+                connection.execute("INSERT OR IGNORE INTO knowledge VALUES (?, ?, ?)",
+                                   (section, key, json.dumps(record[3])))
+            else:
+                rows = connection.execute("SELECT value FROM knowledge WHERE section = ? AND key = ?",
+                                          (section, key)).fetchall()
+                holder = {"value": json.loads(rows[0][0])} if rows else {}
+                KnowledgeJournal.apply(holder, [record[0], ["value"] + rest] + record[2:])
+                connection.execute("INSERT INTO knowledge VALUES (?, ?, ?) "
+                                   "ON CONFLICT (section, key) DO UPDATE SET value = excluded.value",
+                                   (section, key, json.dumps(holder["value"])))
+            self._uncommitted += 1
+            if self._batching:
+                return
+            if self._uncommitted >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+                self._commit()
+
+    def _commit(self):
+        if self._connection is not None:
+            self._connection.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Collects all records written inside the block into one transaction."""
+        self._batching = True
+        try:
+            yield self
+        finally:
+            self._batching = False
+            self.sync()
+
+    def sync(self):
+        """Commits pending records."""
+        with self._lock:
+            self._commit()
+
+    ### 💾 SNAPSHOTS ###
+
+    def save(self, root):
+        """
+        Makes the store hold root. Lazy views of this store are already persisted
+        record by record; anything else (e.g. a migrated JSON file) is rewritten.
+        """
+        sections = {"": root} if self.sections is None else root
+        with self._lock:
+            connection = self.connection
+            for section, values in sections.items():
+                if isinstance(values, (LazyTable, LazyList)) and values.store is self:
+                    continue
+                connection.execute("DELETE FROM knowledge WHERE section = ?", (section,))
+                items = enumerate(values) if isinstance(values, list) else values.items()
+                connection.executemany("INSERT INTO knowledge VALUES (?, ?, ?)",
+                                       ((section, key, json.dumps(value)) for key, value in items))
+                # Postings of the old keys are rebuilt the next time the section is indexed
+                connection.execute("DELETE FROM indexed_sections WHERE section = ?", (section,))
+                self._indexed.discard(section)
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+def open_knowledge(memory_file, indent=None, sections=None):
+    """
+    Returns the persistence backend for a memory file: SQLiteKnowledge for
+    .db/.sqlite files, otherwise the JSON snapshot plus KnowledgeJournal.
+    """
+    if memory_file.endswith(DATABASE_SUFFIXES):
+        return SQLiteKnowledge(memory_file, sections)
+    return KnowledgeJournal(memory_file, indent=indent)
+
+def open_index(index_class, concepts):
+    """
+    Returns a WordIndex, SubstringIndex or FuzzyIndex over concepts. For a
+    LazyTable it is the SQLite variant, which answers from the store's postings
+    tables, so no index is ever built in memory from every stored key.
+    """
+    if isinstance(concepts, LazyTable):
+        return SQLITE_INDEXES[index_class](concepts.store, concepts.section)
+    return index_class(concepts)
+
+def migrate_json(json_file, database_file, sections=None, convert=None, indexed=()):
+    """
+    One-shot migration of a JSON memory file (and its journal) into SQLite.
+    :param convert: Optional function applied to the loaded JSON before writing.
+    :param indexed: Sections whose concept postings are built now rather than on first use.
+    :return: Number of top-level entries written.
+    """
+    root = KnowledgeJournal(json_file).load()
+    if convert is not None:
+        root = convert(root)
+    store = SQLiteKnowledge(database_file, sections)
+    store.save(root)
+    for section in indexed:
+        store._index_section(section)
+    store.close()
+    return len(root) if sections is None else sum(len(root.get(section, ())) for section in sections)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate a JSON memory file into a SQLite knowledge store.")
+    parser.add_argument("json_file", help="e.g. memory.json or spiral_memory.json")
+    parser.add_argument("database_file", help="e.g. memory.db or spiral_memory.db")
+    parser.add_argument("--interned", action="store_true",
+                        help="Use the concepts/explanations/links layout of the evolving-mind variants.")
+    args = parser.parse_args()
+    if args.interned:
+        from knowledge_graph import SECTIONS, is_interned, migrate_legacy_knowledge
+
+        count = migrate_json(args.json_file, args.database_file, SECTIONS,
+                             lambda root: root if is_interned(root) else migrate_legacy_knowledge(root),
+                             indexed=("concepts",))
+    else:
+        count = migrate_json(args.json_file, args.database_file, indexed=("",))
+    print(f"✅ Migrated {count} entries from {args.json_file} to {args.database_file}")
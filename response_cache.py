@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    Bounded LRU cache for answers to read-only chat queries.
+    Entries are keyed on the normalized query and the knowledge base's version,
+    which learning bumps, so an answer computed before a change is never served
+    after it. With cache_candidates, what an answer is drawn from is cached
+    rather than the answer, and each hit still composes a fresh random reply.
+    """
+
+    def __init__(self, max_entries=4096, cache_candidates=False):
+        """
+        :param max_entries: Entries kept before the least recently used is dropped.
+        :param cache_candidates: Cache candidate sets and compose on every hit, instead of final strings.
+        """
+        self.max_entries = max_entries
+        self.cache_candidates = cache_candidates
+        self.stats = {"hits": 0, "misses": 0}
+        self._entries = OrderedDict()  # (normalized query, version) -> cached value
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.split()).lower()
+
+    def lookup(self, query, version, candidates, compose=None):
+        """
+        Answers a query from the cache, computing and storing it on a miss.
+        :param version: Knowledge base version the answer depends on.
+        :param candidates: candidates() -> what the answer is drawn from, or None if there is none.
+        :param compose: compose(candidates) -> the answer (default: the candidates themselves).
+        :return: The answer, or None.
+        """
+        key = (self.normalize(query), version)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()  # Every key of an older version is dead
+                self._version = version
+            found = key in self._entries
+            if found:
+                value = self._entries[key]
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+        if not found:
+            value = candidates()
+            if value is not None and compose is not None and not self.cache_candidates:
+                value = compose(value)
+            with self._lock:
+                if version == self._version:
+                    self._entries[key] = value
+                    if len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+        if value is None or compose is None or not self.cache_candidates:
+            return value
+        return compose(value)
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,71 @@
+from array import array
+
+class RingBuffer:
+    """
+    Fixed-capacity memory for the spiral models, backed by a flat typed array.
+    Every value is written twice (at slot i and i + capacity), so the retained
+    window is always one contiguous run: append is O(1) and ordered views are
+    zero-copy slices of the same buffer.
+    """
+
+    def __init__(self, capacity, typecode="d"):
+        """
+        Initialize an empty ring buffer.
+        :param capacity: Maximum number of values retained; older values are dropped.
+        :param typecode: array typecode of the stored values ('d' for floats, 'q' for ints).
+        """
+        self.capacity = max(capacity, 0)
+        self.typecode = typecode
+        self._buffer = array(typecode, bytes(array(typecode).itemsize * 2 * self.capacity))
+        self._start = 0
+        self._length = 0
+
+    def append(self, value):
+        """
+        Stores a value, overwriting the oldest one once the buffer is full.
+        """
+        capacity = self.capacity
+        if not capacity:
+            return
+        length = self._length
+        if length < capacity:
+            slot = self._start + length
+            self._length = length + 1
+        else:
+            slot = self._start
+            self._start = slot + 1 if slot + 1 < capacity else 0
+        if slot >= capacity:
+            slot -= capacity
+        buffer = self._buffer
+        buffer[slot] = value
+        buffer[slot + capacity] = value
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def view(self):
+        """
+        Returns the retained values, oldest first, as a zero-copy memoryview.
+        The view reflects the buffer at call time; later appends may overwrite it.
+        """
+        return memoryview(self._buffer)[self._start:self._start + self._length]
+
+    def tolist(self):
+        return self.view().tolist()
+
+    def clear(self):
+        self._start = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __repr__(self):
+        return f"RingBuffer({self.tolist()!r}, capacity={self.capacity})"
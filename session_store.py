@@ -0,0 +1,124 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+SESSION_COOKIE = "spiral_session"
+
+class SessionStore:
+    """
+    Per-client conversation context for the chat web apps.
+    Each session keeps its last few messages in a bounded deque. Sessions are held
+    in least-recently-used order, so idle ones fall off the front once they outlive
+    the TTL or the store is full, and memory stays flat however many clients connect.
+    """
+
+    def __init__(self, history=5, max_sessions=10000, ttl=1800):
+        """
+        :param history: Messages remembered per session.
+        :param max_sessions: Sessions kept before the least recently used is dropped.
+        :param ttl: Seconds of inactivity after which a session is forgotten.
+        """
+        self.history = history
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # Session id -> [deque of messages, last seen]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id():
+        return secrets.token_urlsafe(16)
+
+    def remember(self, session_id, message):
+        """Adds a message to a session's context and returns the context, oldest first."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or now - entry[1] >= self.ttl:
+                entry = self._sessions[session_id] = [deque(maxlen=self.history), now]
+            entry[1] = now
+            self._sessions.move_to_end(session_id)
+            entry[0].append(message)
+            self._evict(now)
+            return list(entry[0])
+
+    def context(self, session_id):
+        """Returns a session's remembered messages, oldest first."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                return []
+            return list(entry[0])
+
+    def forget(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _evict(self, now):
+        # Oldest first, so stop at the first session that is neither expired nor over capacity
+        sessions = self._sessions
+        while sessions:
+            _, last_seen = next(iter(sessions.values()))
+            if len(sessions) <= self.max_sessions and now - last_seen < self.ttl:
+                break
+            sessions.popitem(last=False)
+
+    def __len__(self):
+        return len(self._sessions)
+
+class ReadWriteLock:
+    """
+    Guards a knowledge base shared by server threads. Any number of readers
+    (recall) run together; a writer (learn) runs alone. Waiting writers hold
+    back new readers, so a steady stream of questions cannot starve learning,
+    and the readers held back by a writer all go before the next writer, so a
+    steady stream of learning cannot starve questions either.
+    Not reentrant: take it once, at the outermost public method.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+        self._waiting_readers = 0
+        self._admitted = 0  # Readers that were waiting when the last writer finished
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            waited = False
+            while self._writing or (self._waiting_writers and not self._admitted):
+                if not waited:
+                    self._waiting_readers += 1
+                    waited = True
+                self._condition.wait()
+            if waited:
+                self._waiting_readers -= 1
+                if self._admitted:
+                    self._admitted -= 1
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers or self._admitted:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._admitted = self._waiting_readers
+                self._condition.notify_all()
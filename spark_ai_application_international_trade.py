@@ -1,40 +1,174 @@
-from pyspark.sql import SparkSession
+# pyspark is optional: it is imported only when the Spark backend is used
+import argparse
+import functools
 import math
 import random
 
-spark = SparkSession.builder \
-    .appName("SpiralTradeOptimizer") \
-    .config("spark.executor.memory", "4g") \
-    .config("spark.driver.memory", "2g") \
-    .getOrCreate()
+import numpy as np
+
+import ring_buffer
+import spiral_rng
+import spiral_sketch
+import trade_network
+from ring_buffer import RingBuffer
+from spiral_rng import BlockUniform, make_generator, partition_generator
+from spiral_executor import SparkExecutor, make_executor
+from spiral_sketch import MomentSketch, QuantileSketch
+from trade_network import RouteNetwork
+
+# Modules the Spark executors need to import
+PY_FILES = [module.__file__ for module in (ring_buffer, spiral_rng, spiral_sketch, trade_network)]
 
 class TradeRouteOptimizer:
-    def __init__(self, start_cost=1000, demand_factor=math.e, memory_limit=1000):
+    def __init__(self, start_cost=1000, demand_factor=math.e, memory_limit=1000, rng=None,
+                 network=None, routes=(), lanes_per_tick=None):
+        """
+        Evolves a single trade cost, or every lane of a port network.
+        :param network: Optional RouteNetwork (or iterable of (origin, destination, cost)
+            lanes); lane costs then evolve with the demand_factor/fluctuation model.
+        :param routes: (origin, destination) pairs whose cheapest routes are kept up to date.
+        :param lanes_per_tick: Lanes given a fresh fluctuation each tick (default: all lanes).
+            Smaller values let the route trees be repaired incrementally.
+        """
         self.current_cost = start_cost
         self.demand_factor = demand_factor
-        self.memory = []
+        self.memory = RingBuffer(memory_limit)
         self.memory_limit = memory_limit
+        # Own reproducible fluctuation stream when a Generator/seed is given
+        self.fluctuation = BlockUniform(0.9, 1.1, rng) if rng is not None else None
+        self.network = None
+        if network is not None:
+            self.network = network if isinstance(network, RouteNetwork) else RouteNetwork(network)
+            self.routes = list(routes)
+            self.lanes_per_tick = lanes_per_tick
+            self.rng = make_generator(rng)
+            # demand_factor scales every lane alike, which never changes which route is
+            # cheapest, so it is kept as one shared factor instead of rewriting each lane
+            self.demand_scale = 1.0
+            self.lane_list = self.network.lanes()
+            for origin, _ in self.routes:
+                self.network.track(origin)
 
     def next_route(self):
-        fluctuation = random.uniform(0.9, 1.1)
+        if self.network is not None:
+            return self.next_network_routes()
+        fluctuation = self.fluctuation() if self.fluctuation is not None else random.uniform(0.9, 1.1)
         self.current_cost *= (self.demand_factor * fluctuation)
-        self.memory.append(self.current_cost)
         self.manage_memory()
         return self.current_cost
 
+    def next_network_routes(self):
+        """Advances every lane one tick and returns {(origin, destination): (cost, ports)}
+        for the requested routes."""
+        self.demand_scale *= self.demand_factor
+        lanes = self.lane_list
+        if self.lanes_per_tick is not None and self.lanes_per_tick < len(lanes):
+            picked = self.rng.choice(len(lanes), self.lanes_per_tick, replace=False).tolist()
+        else:
+            picked = range(len(lanes))
+        fluctuations = self.rng.uniform(0.9, 1.1, len(picked)).tolist()
+        self.network.update_lanes([(lanes[i], self.network.cost(*lanes[i]) * fluctuation)
+                                   for i, fluctuation in zip(picked, fluctuations)])
+        results = {}
+        for origin, destination in self.routes:
+            cost, ports = self.network.route(origin, destination)
+            results[(origin, destination)] = (cost * self.demand_scale, ports)
+        if self.routes:
+            self.current_cost = results[self.routes[0]][0]
+            self.manage_memory()
+        return results
+
     def manage_memory(self):
-        if len(self.memory) > self.memory_limit:
-            self.memory.pop(0)
+        self.memory.append(self.current_cost)
+
+SEED = 2024  # Root seed: every simulation spawns its own stream from it
 
-def run_trade_optimizer(index):
-    trade_ai = TradeRouteOptimizer(start_cost=index * 1000)
+def run_trade_optimizer(index, seed=SEED):
+    # Keyed on the simulation index, so results do not depend on how Spark partitions the work
+    trade_ai = TradeRouteOptimizer(start_cost=index * 1000, rng=partition_generator(seed, index))
     return [trade_ai.next_route() for _ in range(100)]
 
-num_nodes = 10  # 10 parallel trade simulations
-rdd = spark.sparkContext.parallelize(range(1, num_nodes + 1))
-results = rdd.map(run_trade_optimizer).collect()
+### 🎲 MONTE CARLO MODE ###
+
+def simulate_trade_paths(start_cost, paths, steps, rng, demand_factor=math.e):
+    """Vectorized TradeRouteOptimizer: returns a (paths, steps) array of cost paths."""
+    fluctuation = rng.uniform(0.9, 1.1, (paths, steps))
+    return start_cost * np.cumprod(demand_factor * fluctuation, axis=1)
+
+def run_monte_carlo_chunk(task, steps, seed):
+    """Simulates one chunk of paths for one route and reduces it to mergeable sketches.
+    Each (route, chunk) pair has its own spawned seed, so results do not depend on
+    how the chunks are partitioned across executors."""
+    route, chunk, paths = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(route, chunk)))
+    with np.errstate(over="ignore"):
+        costs = simulate_trade_paths(route * 1000, paths, steps, rng)
+    final_costs = costs[:, -1]
+    if not np.isfinite(final_costs).all():
+        raise OverflowError(f"Trade costs overflow float64 within {steps} steps; use fewer steps.")
+    summary = (MomentSketch().add_many(final_costs), QuantileSketch().add_many(final_costs),
+               MomentSketch().add_many(costs))
+    return route, summary
+
+def merge_summaries(left, right):
+    return tuple(a.merge(b) for a, b in zip(left, right))
+
+def run_monte_carlo(executor, num_routes, paths_per_route, steps=100, chunk_size=10000, seed=SEED):
+    """Runs paths_per_route simulated cost paths for each route. Chunks are reduced to
+    sketches where they run (merged on the Spark executors with reduceByKey), so only
+    one set of sketches per route reaches the driver."""
+    tasks = [(route, chunk, min(chunk_size, paths_per_route - offset))
+             for route in range(1, num_routes + 1)
+             for chunk, offset in enumerate(range(0, paths_per_route, chunk_size))]
+    run_chunk = functools.partial(run_monte_carlo_chunk, steps=steps, seed=seed)
+    if isinstance(executor, SparkExecutor):
+        summaries = executor.session.sparkContext.parallelize(tasks, len(tasks)) \
+            .map(run_chunk) \
+            .reduceByKey(merge_summaries) \
+            .collect()
+    else:
+        merged = {}
+        for route, summary in executor.map(run_chunk, tasks):
+            merged[route] = merge_summaries(merged[route], summary) if route in merged else summary
+        summaries = merged.items()
+
+    results = {}
+    for route, (final_moments, final_quantiles, path_moments) in sorted(summaries):
+        results[route] = {
+            "final_cost": final_moments.to_dict(),
+            "p5": final_quantiles.quantile(0.05),
+            "p50": final_quantiles.quantile(0.50),
+            "p95": final_quantiles.quantile(0.95),
+            "final_cost_distribution": final_quantiles.histogram(),
+            "mean_path": path_moments.mean.tolist(),
+            "path_variance": path_moments.variance().tolist(),
+        }
+    return results
+
+def run_trade_optimizers(executor, num_nodes, seed=SEED):
+    """Runs run_trade_optimizer for simulations 1..num_nodes on any executor backend."""
+    return executor.map(functools.partial(run_trade_optimizer, seed=seed), range(1, num_nodes + 1))
 
-for idx, res in enumerate(results):
-    print(f"Trade Simulation {idx + 1}: {res[:5]}...")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spiral trade route cost simulations.")
+    parser.add_argument("--backend", choices=("local", "spark"), default="local",
+                        help="local: concurrent.futures process pool; spark: SparkSession (started lazily).")
+    parser.add_argument("--num-nodes", type=int, default=10, help="Number of trade routes to simulate.")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="PATHS",
+                        help="Simulate PATHS cost paths per route and report aggregate statistics.")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--master", default=None, help="e.g. local[*] for a single-machine test run.")
+    args = parser.parse_args()
 
-spark.stop()
\ No newline at end of file
+    executor = make_executor(args.backend, app_name="SpiralTradeOptimizer", master=args.master, py_files=PY_FILES,
+                             config={"spark.executor.memory": "4g", "spark.driver.memory": "2g"})
+    with executor:
+        if args.monte_carlo:
+            for route, stats in run_monte_carlo(executor, args.num_nodes, args.monte_carlo, args.steps, seed=args.seed).items():
+                final = stats["final_cost"]
+                print(f"Trade Route {route}: mean={final['mean']:.4g} std={math.sqrt(final['variance']):.4g} "
+                      f"P5={stats['p5']:.4g} P50={stats['p50']:.4g} P95={stats['p95']:.4g}")
+        else:
+            for idx, res in enumerate(run_trade_optimizers(executor, args.num_nodes, args.seed)):
+                print(f"Trade Simulation {idx + 1}: {res[:5]}...")
@@ -3,46 +3,135 @@ import numpy as np
 import random
 from datetime import datetime
 
+from ring_buffer import RingBuffer
+from spiral_rng import BlockUniform, make_generator
+
 class SpiralAI:
     """
     Spiral-Based AI Model: A lightweight, real-time learning AI.
     Uses a self-evolving spiral function to generate and adapt its intelligence dynamically.
     """
 
-    def __init__(self, start=1, growth_factor=math.e, memory_limit=10, adaptability=0.1):
+    def __init__(self, start=1, growth_factor=math.e, memory_limit=10, adaptability=0.1, log_space=False,
+                 rng=None):
         """
         Initialize SpiralAI with dynamic memory expansion.
         :param start: Initial value of the AI state.
         :param growth_factor: The base for exponential learning (default: Euler's number).
         :param memory_limit: Number of past states to retain.
         :param adaptability: The rate at which AI adjusts to new inputs.
+        :param log_space: Track the state as log(position) so long runs stay finite.
+            next_value(), advance(), trajectory() and memory then report log-positions;
+            start and growth factors must stay positive.
+        :param rng: Optional NumPy Generator or seed giving this instance its own
+            reproducible jitter stream (see spiral_rng); None uses the global random module.
         """
-        self.position = start
+        self.log_space = log_space
+        self.jitter = BlockUniform(-0.1, 0.1, rng) if rng is not None else None
         self.growth_factor = growth_factor
-        self.memory = []
+        self.memory = RingBuffer(memory_limit)
         self.memory_limit = memory_limit
         self.adaptability = adaptability
+        self.set_position(start)
         self.last_update = datetime.now()
 
+    def set_position(self, position):
+        """
+        Sets the AI state, keeping position and log_position in sync in log space.
+        """
+        self.position = position
+        self.log_position = math.log(position) if self.log_space else None
+
+    def state(self):
+        """
+        Returns the tracked state: log_position in log space, position otherwise.
+        """
+        return self.log_position if self.log_space else self.position
+
     def next_value(self):
         """
         Generates the next step in the spiral-based learning model.
         It evolves dynamically instead of running in static loops.
         """
         time_elapsed = (datetime.now() - self.last_update).total_seconds()
-        self.position *= self.growth_factor + (self.adaptability * random.uniform(-0.1, 0.1))
-        self.memory.append(self.position)
+        jitter = self.jitter() if self.jitter is not None else random.uniform(-0.1, 0.1)
+        factor = self.growth_factor + (self.adaptability * jitter)
+        if self.log_space:
+            self.log_position += math.log(factor)
+            self.position = _exp(self.log_position)
+        else:
+            self.position *= factor
         self.manage_memory()
         self.last_update = datetime.now()
-        return self.position
+        return self.state()
 
     def manage_memory(self):
         """
-        Manages memory retention by removing outdated values.
+        Records the current state, letting the ring buffer drop the oldest value.
         Ensures AI remains adaptive while reducing unnecessary data storage.
         """
-        if len(self.memory) > self.memory_limit:
-            self.memory.pop(0)
+        self.memory.append(self.state())
+
+    def trajectory(self, steps):
+        """
+        Advances the AI by the given number of steps in one vectorized pass.
+        Returns a NumPy array of the successive states (log-positions in log space).
+        The jittered case takes a cumulative sum of per-step log-factors instead of
+        making one Python call per step.
+        """
+        if steps <= 0:
+            return np.empty(0)
+        if self.adaptability:
+            jitter = self.jitter.draw(steps) if self.jitter is not None else np.random.uniform(-0.1, 0.1, steps)
+            factors = self.growth_factor + self.adaptability * jitter
+        else:
+            factors = np.full(steps, float(self.growth_factor))
+        with np.errstate(over="ignore"):
+            if self.log_space:
+                states = self.log_position + np.cumsum(np.log(factors))
+            else:
+                states = self.position * np.cumprod(factors)
+        self._record_states(states)
+        return states
+
+    def advance(self, steps):
+        """
+        Jumps the AI ahead by the given number of steps and returns the new state.
+        Without jitter (adaptability == 0) this is closed form: O(1) in steps apart
+        from refilling at most memory_limit memory slots.
+        """
+        if steps <= 0:
+            return self.state()
+        if self.adaptability:
+            self.trajectory(steps)
+            return self.state()
+        kept = np.arange(steps - min(steps, self.memory_limit) + 1, steps + 1)
+        with np.errstate(over="ignore"):
+            if self.log_space:
+                states = self.log_position + kept * math.log(self.growth_factor)
+            else:
+                states = self.position * np.power(float(self.growth_factor), kept)
+        if len(states):
+            self._record_states(states)
+        elif self.log_space:
+            self.log_position += steps * math.log(self.growth_factor)
+            self.position = _exp(self.log_position)
+        else:
+            self.position *= _power(self.growth_factor, steps)
+        return self.state()
+
+    def _record_states(self, states):
+        """
+        Stores the newest states in memory and makes the last one current.
+        """
+        self.memory.extend(states[-self.memory_limit:].tolist() if self.memory_limit > 0 else ())
+        last = float(states[-1])
+        if self.log_space:
+            self.log_position = last
+            self.position = _exp(last)
+        else:
+            self.position = last
+        self.last_update = datetime.now()
 
     def adjust_growth_factor(self, external_input):
         """
@@ -53,16 +142,320 @@ class SpiralAI:
 
     def get_memory(self):
         """
-        Returns stored memory states for external applications.
+        Returns stored memory states for external applications, oldest first.
+        The result is a zero-copy view; use .tolist() to keep a snapshot.
         """
-        return self.memory
+        return self.memory.view()
 
     def reset(self, start=1):
         """
         Resets the AI to its initial state for testing and new implementations.
         """
+        self.set_position(start)
+        self.memory.clear()
+
+    ### 💾 SNAPSHOTS ###
+
+    def to_record(self, record):
+        """
+        Writes this AI's state into one record of a state_dtype() array.
+        """
+        record["position"] = self.position
+        record["log_position"] = math.nan if self.log_position is None else self.log_position
+        record["log_space"] = self.log_space
+        record["growth_factor"] = self.growth_factor
+        record["adaptability"] = self.adaptability
+        record["memory_length"] = len(self.memory)
+        record["memory"][:len(self.memory)] = self.memory.view()
+        record["last_update"] = np.datetime64(self.last_update, "us")
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Rebuilds a SpiralAI from one record of a state_dtype() array.
+        """
+        spiral_ai = cls(memory_limit=record["memory"].shape[0], log_space=bool(record["log_space"]))
+        spiral_ai.position = float(record["position"])
+        spiral_ai.log_position = float(record["log_position"]) if spiral_ai.log_space else None
+        spiral_ai.growth_factor = float(record["growth_factor"])
+        spiral_ai.adaptability = float(record["adaptability"])
+        spiral_ai.memory.extend(record["memory"][:record["memory_length"]].tolist())
+        spiral_ai.last_update = record["last_update"].astype(datetime)
+        return spiral_ai
+
+    def save_state(self, path):
+        """
+        Saves this AI as a one-record snapshot file (see save_states).
+        """
+        save_states([self], path)
+
+    @classmethod
+    def load_state(cls, path, index=0, mmap_mode="r"):
+        """
+        Loads one AI from a snapshot file; only that record is read from disk.
+        """
+        return cls.from_record(load_states(path, mmap_mode)[index])
+
+def state_dtype(memory_limit):
+    """
+    Fixed binary layout of one SpiralAI snapshot record.
+    Memory is stored oldest first, padded to memory_limit slots.
+    """
+    return np.dtype([
+        ("position", "<f8"),
+        ("log_position", "<f8"),
+        ("log_space", "?"),
+        ("growth_factor", "<f8"),
+        ("adaptability", "<f8"),
+        ("memory_length", "<i8"),
+        ("memory", "<f8", (memory_limit,)),
+        ("last_update", "<M8[us]"),
+    ])
+
+def save_states(instances, path):
+    """
+    Writes SpiralAI instances sharing one memory_limit to a .npy snapshot file.
+    """
+    instances = list(instances)
+    memory_limit = instances[0].memory_limit if instances else 0
+    records = np.zeros(len(instances), dtype=state_dtype(memory_limit))
+    for record, spiral_ai in zip(records, instances):
+        if spiral_ai.memory_limit != memory_limit:
+            raise ValueError("All instances in a snapshot must share the same memory_limit.")
+        spiral_ai.to_record(record)
+    np.save(path, records)
+
+def load_states(path, mmap_mode="r"):
+    """
+    Opens a snapshot as a structured array, memory-mapped by default so a restarted
+    worker can resume instantly and read just the shard it needs, e.g.
+    load_states(path)[start:stop]. Pass mmap_mode=None to read it fully into RAM.
+    """
+    return np.load(path, mmap_mode=mmap_mode)
+
+def _exp(value):
+    """exp() that overflows to inf like float multiplication does, instead of raising."""
+    try:
+        return math.exp(value)
+    except OverflowError:
+        return math.inf
+
+def _power(base, exponent):
+    try:
+        return base ** exponent
+    except OverflowError:
+        return math.inf
+
+class SpiralEnsemble:
+    """
+    Vectorized Spiral AI: steps many independent SpiralAI instances at once.
+    Position, growth factor, adaptability and memory for all N instances live in
+    NumPy arrays, so a single next_value() call advances every spiral.
+    """
+
+    def __init__(self, starts, growth_factor=math.e, memory_limit=10, adaptability=0.1, log_space=False,
+                 rng=None):
+        """
+        Initialize an ensemble of spirals, one per start value.
+        :param starts: Sequence of initial AI states, one per instance.
+        :param growth_factor: Scalar or per-instance base for exponential learning.
+        :param memory_limit: Number of past states each instance retains.
+        :param adaptability: Scalar or per-instance rate of adjustment to new inputs.
+        :param log_space: Track log(position) instead of position, as in SpiralAI.
+        :param rng: Optional NumPy Generator or seed for reproducible jitter; None uses
+            the global NumPy random state.
+        """
+        self.log_space = log_space
+        self.rng = make_generator(rng) if rng is not None else np.random
+        self.position = np.array(starts, dtype=float).ravel()
+        if log_space:
+            self.position = np.log(self.position)
+        size = self.position.shape[0]
+        self.growth_factor = np.array(np.broadcast_to(growth_factor, size), dtype=float)
+        self.adaptability = np.array(np.broadcast_to(adaptability, size), dtype=float)
+        self.memory_limit = memory_limit
+        # Memory is a ring of rows: row k holds every instance's state for one step,
+        # so recording a step is a single contiguous write.
+        self.memory = np.zeros((memory_limit, size))
+        self.memory_count = np.zeros(size, dtype=np.int64)
+        self.memory_cursor = 0
+        self.last_update = datetime.now()
+
+    def __len__(self):
+        return self.position.shape[0]
+
+    def next_value(self):
+        """
+        Generates the next spiral step for every instance in one batched call.
+        Returns a copy of the new positions (log-positions in log space).
+        """
+        factor = self._factors(1)[0]
+        with np.errstate(over="ignore"):  # Overflow to inf, as plain floats do
+            if self.log_space:
+                self.position += np.log(factor)
+            else:
+                self.position *= factor
+        self.manage_memory()
+        self.last_update = datetime.now()
+        return self.position.copy()  # The next step updates self.position in place
+
+    def _factors(self, steps):
+        """
+        Draws the per-step multipliers for every instance as a (steps, N) array.
+        """
+        if not self.adaptability.any():
+            return np.broadcast_to(self.growth_factor, (steps, len(self)))
+        return self.growth_factor + self.adaptability * self.rng.uniform(-0.1, 0.1, (steps, len(self)))
+
+    def manage_memory(self):
+        """
+        Records the current positions, overwriting the oldest row once the ring is full.
+        """
+        if self.memory_limit <= 0:
+            return
+        self.memory[self.memory_cursor] = self.position
+        self.memory_cursor = (self.memory_cursor + 1) % self.memory_limit
+        np.minimum(self.memory_count + 1, self.memory_limit, out=self.memory_count)
+
+    def trajectory(self, steps):
+        """
+        Advances every instance by the given number of steps in one vectorized pass.
+        Returns an (N, steps) array holding each instance's successive positions
+        (log-positions in log space).
+        """
+        if steps <= 0:
+            return np.empty((len(self), 0))
+        factors = self._factors(steps)
+        with np.errstate(over="ignore"):
+            if self.log_space:
+                results = self.position + np.cumsum(np.log(factors), axis=0)
+            else:
+                results = self.position * np.cumprod(factors, axis=0)
+        kept = min(steps, self.memory_limit)
+        for row in results[steps - kept:]:
+            self.position = row
+            self.manage_memory()
+        self.position = results[-1].copy()
+        self.last_update = datetime.now()
+        return results.T
+
+    def advance(self, steps):
+        """
+        Jumps every instance ahead by the given number of steps and returns the new states.
+        Instances without jitter (adaptability == 0) use the closed form.
+        """
+        if steps <= 0:
+            return self.position.copy()
+        jittered = self.adaptability != 0
+        if jittered.any():
+            return self.trajectory(steps)[:, -1]
+        kept = np.arange(steps - min(steps, self.memory_limit) + 1, steps + 1)
+        with np.errstate(over="ignore", divide="ignore"):
+            if self.log_space:
+                rows = self.position + np.outer(kept, np.log(self.growth_factor))
+                self.position = self.position + steps * np.log(self.growth_factor)
+            else:
+                rows = self.position * np.power.outer(self.growth_factor, kept).T
+                self.position = self.position * np.power(self.growth_factor, steps)
+        start = self.position
+        for row in rows:
+            self.position = row
+            self.manage_memory()
         self.position = start
-        self.memory = []
+        self.last_update = datetime.now()
+        return self.position.copy()
+
+    def adjust_growth_factor(self, external_input, index=None):
+        """
+        Adjusts growth factors from external data, for all instances or the selected ones.
+        :param external_input: Scalar or array of inputs matching the selection.
+        :param index: Instance index, slice or index array; None selects all instances.
+        """
+        if index is None:
+            index = slice(None)
+        self.growth_factor[index] += np.asarray(external_input) * self.adaptability[index]
+
+    def get_memory(self, index):
+        """
+        Returns the stored memory states of one instance, oldest first.
+        """
+        count = self.memory_count[index]
+        rows = (self.memory_cursor - count + np.arange(count)) % max(self.memory_limit, 1)
+        return self.memory[rows, index]
+
+    def reset(self, start=1, index=None):
+        """
+        Resets all instances, or the selected ones, to a new start value.
+        """
+        if index is None:
+            index = slice(None)
+        self.position[index] = math.log(start) if self.log_space else start
+        self.memory_count[index] = 0
+
+    def to_records(self):
+        """
+        Returns the whole ensemble as a state_dtype() array, one record per instance.
+        """
+        records = np.zeros(len(self), dtype=state_dtype(self.memory_limit))
+        if self.log_space:
+            records["log_position"] = self.position
+            with np.errstate(over="ignore"):
+                records["position"] = np.exp(self.position)
+        else:
+            records["log_position"] = math.nan
+            records["position"] = self.position
+        records["log_space"] = self.log_space
+        records["growth_factor"] = self.growth_factor
+        records["adaptability"] = self.adaptability
+        records["memory_length"] = self.memory_count
+        if self.memory_limit > 0:
+            slots = np.arange(self.memory_limit)
+            rows = (self.memory_cursor - self.memory_count[:, None] + slots) % self.memory_limit
+            ordered = self.memory[rows, np.arange(len(self))[:, None]]
+            records["memory"] = np.where(slots < self.memory_count[:, None], ordered, 0.0)
+        records["last_update"] = np.datetime64(self.last_update, "us")
+        return records
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Rebuilds an ensemble from a state_dtype() array, such as a memory-mapped shard.
+        The ensemble runs in log space if any record does; linear records are converted.
+        """
+        flags = np.asarray(records["log_space"], dtype=bool)
+        log_space = bool(flags.any())
+        memory = records["memory"]
+        if log_space:
+            with np.errstate(divide="ignore", invalid="ignore"):  # Padding slots are never read
+                states = np.where(flags, records["log_position"], np.log(records["position"]))
+                memory = np.where(flags[:, None], memory, np.log(memory))
+        else:
+            states = records["position"]
+        ensemble = cls(np.ones(len(records)), growth_factor=records["growth_factor"],
+                       memory_limit=records.dtype["memory"].shape[0],
+                       adaptability=records["adaptability"], log_space=log_space)
+        ensemble.position = np.array(states, dtype=float)
+        ensemble.memory_count = np.array(records["memory_length"], dtype=np.int64)
+        if ensemble.memory_limit > 0:
+            slots = np.arange(ensemble.memory_limit)
+            rows = (slots - ensemble.memory_count[:, None]) % ensemble.memory_limit
+            ensemble.memory[rows, np.arange(len(records))[:, None]] = memory
+        if len(records):
+            ensemble.last_update = records["last_update"].max().astype(datetime)
+        return ensemble
+
+    def save_state(self, path):
+        """
+        Saves the ensemble in the same snapshot format as SpiralAI.save_state.
+        """
+        np.save(path, self.to_records())
+
+    @classmethod
+    def load_state(cls, path, start=None, stop=None, mmap_mode="r"):
+        """
+        Loads the ensemble, or just the [start:stop] shard, from a snapshot file.
+        """
+        return cls.from_records(load_states(path, mmap_mode)[start:stop])
 
 # Example Usage:
 if __name__ == "__main__":
@@ -1,50 +1,125 @@
-pip install pyspark
-from pyspark.sql import SparkSession
+# pyspark is optional: it is imported only when the Spark backend is used (pip install pyspark)
+import argparse
+import functools
+import itertools
 import math
 
-# Initialize a Spark session
-spark = SparkSession.builder \
-    .appName("SpiralAI-PySpark") \
-    .config("spark.executor.memory", "4g") \
-    .config("spark.driver.memory", "2g") \
-    .getOrCreate()
+import ring_buffer
+import spiral_ai
+import spiral_rng
+from ring_buffer import RingBuffer
+from spiral_ai import SpiralEnsemble
+from spiral_executor import SparkExecutor, make_executor
+
+# Modules the Spark executors need to import
+PY_FILES = [ring_buffer.__file__, spiral_rng.__file__, spiral_ai.__file__]
 
 class SpiralAI:
     def __init__(self, start=1, growth_factor=math.e, memory_limit=1000):
         """Initialize Spiral AI with dynamic memory expansion for distributed computing."""
         self.position = start
         self.growth_factor = growth_factor
-        self.memory = []
+        self.memory = RingBuffer(memory_limit)
         self.memory_limit = memory_limit
 
     def next_value(self):
         """Compute next spiral value with exponential growth."""
         self.position *= self.growth_factor  
-        self.memory.append(self.position)
         self.manage_memory()
         return self.position
 
     def manage_memory(self):
-        """Removes outdated data to optimize memory usage."""
-        if len(self.memory) > self.memory_limit:
-            self.memory.pop(0)  # Removes the oldest memory entry
+        """Records the new state; the ring buffer drops the oldest entry in O(1)."""
+        self.memory.append(self.position)
 
 def run_spiral(index):
     """Function to run Spiral AI logic on distributed nodes."""
     spiral_ai = SpiralAI(start=index)
     return [spiral_ai.next_value() for _ in range(100)]
 
-# Create an RDD with start values for distributed processing
-num_nodes = 100  # Number of Spark nodes (adjust based on cluster size)
-start_values = range(1, num_nodes + 1)
+def run_spiral_block(indices, steps=100, log_space=False):
+    """Runs a whole partition of start values in one vectorized SpiralEnsemble."""
+    indices = list(indices)
+    if not indices:
+        return []
+    ensemble = SpiralEnsemble(indices, memory_limit=1000, adaptability=0, log_space=log_space)
+    return ensemble.trajectory(steps).tolist()
+
+def spiral_schema():
+    from pyspark.sql.types import ArrayType, DoubleType, LongType, StructField, StructType
+
+    return StructType([
+        StructField("start", LongType(), False),
+        StructField("block", LongType(), False),
+        StructField("trajectory", ArrayType(DoubleType()), False),
+        StructField("final_value", DoubleType(), False),
+    ])
+
+def run_spiral_partition(rows, steps=100, log_space=False, block_size=1000, chunk_size=10000):
+    """Steps a whole partition of start values as SpiralEnsembles of up to chunk_size
+    instances each, yielding one output row per start value."""
+    starts = (row.start for row in rows)
+    while True:
+        chunk = list(itertools.islice(starts, chunk_size))
+        if not chunk:
+            return
+        ensemble = SpiralEnsemble(chunk, memory_limit=1000, adaptability=0, log_space=log_space)
+        for start, trajectory in zip(chunk, ensemble.trajectory(steps)):
+            yield (start, start // block_size, trajectory.tolist(), float(trajectory[-1]))
+
+def run_spiral_job(spark, num_nodes, output_path, steps=100, log_space=False, partitions=None, block_size=1000):
+    """Runs the spiral for start values 1..num_nodes, writes the trajectories to Parquet
+    partitioned by block (start // block_size) and returns only summary statistics."""
+    from pyspark.sql import functions as F
+
+    starts = spark.range(1, num_nodes + 1, numPartitions=partitions).withColumnRenamed("id", "start")
+    trajectories = starts.rdd.mapPartitions(
+        lambda rows: run_spiral_partition(rows, steps, log_space, block_size))
+    results = spark.createDataFrame(trajectories, spiral_schema())
+    results.write.mode("overwrite").partitionBy("block").parquet(output_path)
+
+    # Summaries come from the written files; only final_value is read back
+    summary = spark.read.parquet(output_path).agg(
+        F.count("*").alias("instances"),
+        F.min("final_value").alias("min_final_value"),
+        F.max("final_value").alias("max_final_value"),
+        F.avg("final_value").alias("mean_final_value"),
+    ).first()
+    return summary.asDict()
 
-# Convert to RDD and execute the function in parallel
-rdd = spark.sparkContext.parallelize(start_values)
-results = rdd.map(run_spiral).collect()
+def run_spiral_blocks(executor, num_nodes, steps=100, log_space=False, blocks=None):
+    """Runs run_spiral_block over start values 1..num_nodes on any executor backend."""
+    blocks = blocks or getattr(executor, "max_workers", None) or 8
+    start_values = list(range(1, num_nodes + 1))
+    size = max(-(-len(start_values) // blocks), 1)  # range() needs a step of at least 1
+    chunks = [start_values[i:i + size] for i in range(0, len(start_values), size)]
+    run_block = functools.partial(run_spiral_block, steps=steps, log_space=log_space)
+    return [row for block in executor.map(run_block, chunks) for row in block]
 
-# Print results
-for idx, res in enumerate(results):
-    print(f"Node {idx + 1} Spiral AI Output: {res[:5]}...")  # Only showing first 5 values per node
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Spiral AI on a process pool or on Spark.")
+    parser.add_argument("--backend", choices=("local", "spark"), default="local",
+                        help="local: concurrent.futures process pool; spark: SparkSession (started lazily).")
+    parser.add_argument("--num-nodes", type=int, default=100, help="Number of start values (adjust to cluster size).")
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--output", default=None,
+                        help="Spark only: write trajectories to this Parquet path and print summaries.")
+    parser.add_argument("--master", default=None, help="e.g. local[*] for a single-machine test run.")
+    parser.add_argument("--partitions", type=int, default=None)
+    parser.add_argument("--log-space", action="store_true", help="Store log-positions so long runs stay finite.")
+    args = parser.parse_args()
 
-# Stop Spark session
-spark.stop()
\ No newline at end of file
+    executor = make_executor(args.backend, app_name="SpiralAI-PySpark", master=args.master, py_files=PY_FILES,
+                             config={"spark.executor.memory": "4g", "spark.driver.memory": "2g"})
+    with executor:
+        if args.output:
+            if not isinstance(executor, SparkExecutor):
+                parser.error("--output needs --backend spark")
+            summary = run_spiral_job(executor.session, args.num_nodes, args.output, args.steps,
+                                     args.log_space, args.partitions)
+            print(f"Spiral AI trajectories written to {args.output}: {summary}")
+        else:
+            results = run_spiral_blocks(executor, args.num_nodes, args.steps, args.log_space, args.partitions)
+            # Print results
+            for idx, res in enumerate(results[:10]):
+                print(f"Node {idx + 1} Spiral AI Output: {res[:5]}...")  # Only showing first 5 values per node
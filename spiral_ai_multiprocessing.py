@@ -1,34 +1,122 @@
+import argparse
 import math
 import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+from spiral_ai import SpiralEnsemble
+from spiral_rng import partition_generator
 
 class SpiralAI:
     def __init__(self, start=1, growth_factor=math.e, memory_limit=1000):
         self.position = start
         self.growth_factor = growth_factor
-        self.memory = []
+        self.memory = RingBuffer(memory_limit)
         self.memory_limit = memory_limit
 
     def next_value(self):
         self.position *= self.growth_factor  
-        self.memory.append(self.position)
         self.manage_memory()
         return self.position
 
     def manage_memory(self):
-        if len(self.memory) > self.memory_limit:
-            self.memory.pop(0)
+        self.memory.append(self.position)
+
+def run_spiral_block(start_values, steps=1000, log_space=False, adaptability=0, seed=None, block_index=0):
+    """Steps a whole block of start values in one vectorized SpiralEnsemble.
+    With log_space=True the trajectories hold log-positions, which stay finite
+    past the ~709 steps where e**step overflows a float. Jittered runs
+    (adaptability > 0) with a seed draw from the block's own spawned stream,
+    so results are reproducible for a given seed and block layout."""
+    return spiral_block_trajectories(start_values, steps, log_space, adaptability, seed, block_index).tolist()
+
+def spiral_block_trajectories(start_values, steps=1000, log_space=False, adaptability=0, seed=None, block_index=0):
+    """Same as run_spiral_block, but returns the (len(start_values), steps) NumPy array."""
+    rng = partition_generator(seed, block_index) if seed is not None else None
+    ensemble = SpiralEnsemble(start_values, memory_limit=1000, adaptability=adaptability,
+                              log_space=log_space, rng=rng)
+    return ensemble.trajectory(steps)
+
+def run_spiral_instance(start, log_space=False):
+    return run_spiral_block([start], log_space=log_space)[0]
+
+class SharedTrajectories:
+    """
+    (N, steps) float64 trajectory array living in multiprocessing shared memory.
+    Workers write their rows in place, so results are never pickled or copied back.
+    Use as a context manager, or call close() once done with .array.
+    """
+
+    def __init__(self, rows, steps):
+        self.shape = (rows, steps)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(rows * steps * 8, 1))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+
+    def close(self):
+        """Releases the shared block; .array must not be used afterwards."""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+_worker_shm = None
+_worker_array = None
+
+def _attach_shared(name, shape):
+    """Pool initializer: maps the parent's shared trajectory block once per worker."""
+    global _worker_shm, _worker_array
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_array = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+
+def _fill_shared_block(task):
+    """Worker task: writes one block's trajectories straight into shared memory."""
+    block_index, offset, start_values, steps, log_space, adaptability, seed = task
+    _worker_array[offset:offset + len(start_values)] = spiral_block_trajectories(
+        start_values, steps, log_space, adaptability, seed, block_index)
+    return len(start_values)
 
-def run_spiral_instance(start):
-    spiral_ai = SpiralAI(start=start)
-    results = [spiral_ai.next_value() for _ in range(1000)]
+def run_spiral_shared(start_values, steps=1000, processes=None, block_size=256, chunksize=4,
+                      log_space=False, adaptability=0, seed=None):
+    """
+    Runs every start value across a process pool and returns a SharedTrajectories
+    holding the (N, steps) results.
+    :param processes: Pool size; defaults to all CPU cores.
+    :param block_size: Start values stepped together per vectorized task. Blocks, and so
+        seeded jitter streams, do not depend on the pool size.
+    :param chunksize: Tasks handed to a worker at a time by imap_unordered.
+    """
+    start_values = list(start_values)
+    processes = processes or os.cpu_count() or 1
+    results = SharedTrajectories(len(start_values), steps)
+    tasks = ((index, offset, start_values[offset:offset + block_size], steps, log_space, adaptability, seed)
+             for index, offset in enumerate(range(0, len(start_values), block_size)))
+    try:
+        with multiprocessing.Pool(processes, initializer=_attach_shared,
+                                  initargs=(results.shm.name, results.shape)) as pool:
+            for _ in pool.imap_unordered(_fill_shared_block, tasks, chunksize=chunksize):
+                pass
+    except BaseException:
+        results.close()
+        raise
     return results
 
 if __name__ == "__main__":
-    pool = multiprocessing.Pool(processes=4)  # Uses 4 CPU cores
-    start_values = [1, 2, 3, 4]  # Different start values for diversity
-    results = pool.map(run_spiral_instance, start_values)
+    parser = argparse.ArgumentParser(description="Run Spiral AI instances across CPU cores.")
+    parser.add_argument("--instances", type=int, default=4, help="Number of start values (1..N).")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=None, help="Defaults to all CPU cores.")
+    args = parser.parse_args()
 
-    pool.close()
-    pool.join()
+    start_values = range(1, args.instances + 1)  # Different start values for diversity
+    with run_spiral_shared(start_values, args.steps, args.processes, log_space=True) as results:
+        print(f"Final log-positions: {results.array[:5, -1]}")
 
     print("Spiral AI completed execution.")
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+class LocalExecutor:
+    """
+    Single-node backend: maps work over a concurrent.futures process pool.
+    Starts in milliseconds and needs neither a JVM nor pyspark.
+    """
+
+    name = "local"
+
+    def __init__(self, max_workers=None, chunksize=None):
+        """
+        :param max_workers: Pool size; defaults to all CPU cores.
+        :param chunksize: Items sent to a worker at a time (default: spread evenly over workers).
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._pool = None
+
+    def map(self, func, items):
+        """Returns [func(item) for item in items], computed across the pool."""
+        items = list(items)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.max_workers)
+        chunksize = self.chunksize or max(1, len(items) // (self.max_workers * 4))
+        return list(self._pool.map(func, items, chunksize=chunksize))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SparkExecutor:
+    """
+    Cluster backend: maps work over Spark. pyspark is imported and the SparkSession
+    (and its JVM) started only when the first job runs.
+    """
+
+    name = "spark"
+
+    def __init__(self, app_name="SpiralAI", master=None, config=None, py_files=()):
+        """
+        :param master: Spark master URL, e.g. local[*]; None leaves it to spark-submit.
+        :param config: Extra Spark settings as a dict.
+        :param py_files: Local modules shipped to the executors once the session starts.
+        """
+        self.app_name = app_name
+        self.master = master
+        self.config = dict(config or {})
+        self.py_files = list(py_files)
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            from pyspark.sql import SparkSession
+
+            builder = SparkSession.builder.appName(self.app_name)
+            if self.master:
+                builder = builder.master(self.master)
+            for key, value in self.config.items():
+                builder = builder.config(key, value)
+            self._session = builder.getOrCreate()
+            for path in self.py_files:
+                self._session.sparkContext.addPyFile(path)
+        return self._session
+
+    def map(self, func, items, partitions=None):
+        """Returns [func(item) for item in items], computed on the cluster."""
+        return self.session.sparkContext.parallelize(list(items), partitions).map(func).collect()
+
+    def close(self):
+        if self._session is not None:
+            self._session.stop()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def make_executor(backend="local", **options):
+    """
+    Returns a LocalExecutor or SparkExecutor by name ("local" or "spark").
+    Options a backend does not understand are ignored, so callers can pass both sets.
+    """
+    if backend == "local":
+        return LocalExecutor(options.get("max_workers"), options.get("chunksize"))
+    if backend == "spark":
+        return SparkExecutor(options.get("app_name", "SpiralAI"), options.get("master"),
+                             options.get("config"), options.get("py_files", ()))
+    raise ValueError(f"Unknown backend: {backend!r} (expected 'local' or 'spark')")
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+
+def make_generator(rng):
+    """
+    Returns a NumPy Generator from a Generator, SeedSequence or integer seed.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+def spawn_generators(seed, count):
+    """
+    Returns count independent Generators spawned from one root SeedSequence.
+    Use one per instance or partition; the same seed always yields the same streams.
+    """
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(count)]
+
+def partition_generator(seed, index):
+    """
+    Returns the Generator spawn_generators(seed, n)[index] would give, without
+    spawning the others, so a worker can build just the stream it owns.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+class BlockUniform:
+    """
+    Uniform random draws served from pre-generated blocks.
+    Values are drawn from the Generator block_size at a time, so the per-step cost
+    is an array lookup instead of a Python call into the RNG. The stream of values
+    does not depend on block_size, only on the Generator's seed.
+    """
+
+    def __init__(self, low, high, rng=None, block_size=4096):
+        """
+        :param low: Lower bound of the draws.
+        :param high: Upper bound of the draws.
+        :param rng: Generator, SeedSequence or integer seed (None for fresh entropy).
+        :param block_size: Number of values drawn per refill.
+        """
+        self.low = low
+        self.high = high
+        self.rng = make_generator(rng)
+        self.block_size = block_size
+        self._values = iter(())
+
+    def __call__(self):
+        """Returns the next draw as a float."""
+        for value in self._values:
+            return value
+        self._values = iter(self.rng.uniform(self.low, self.high, self.block_size).tolist())
+        return next(self._values)
+
+    def draw(self, count):
+        """Returns the next count draws as an array, continuing the same stream."""
+        buffered = np.fromiter(itertools.islice(self._values, count), dtype=float)
+        if len(buffered) == count:
+            return buffered
+        return np.concatenate([buffered, self.rng.uniform(self.low, self.high, count - len(buffered))])
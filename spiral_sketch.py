@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+
+class MomentSketch:
+    """
+    Mergeable count, mean, variance, min and max.
+    Values may be scalars or fixed-shape arrays (e.g. one cost per time step), in
+    which case every statistic is tracked element-wise. Partial sketches from
+    different partitions combine exactly with merge() (Chan et al. parallel update).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add_many(self, values):
+        """Adds a batch of values stacked along the first axis."""
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return self
+        batch = MomentSketch()
+        batch.count = len(values)
+        batch.mean = values.mean(axis=0)
+        batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+        batch.min = values.min(axis=0)
+        batch.max = values.max(axis=0)
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Folds another sketch into this one and returns self."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+        return self
+
+    def variance(self):
+        """Sample variance (0 for fewer than two values)."""
+        if self.count < 2:
+            return self.m2 * 0.0
+        return self.m2 / (self.count - 1)
+
+    def to_dict(self):
+        def plain(value):
+            return value.tolist() if isinstance(value, np.ndarray) else float(value)
+        return {
+            "count": self.count,
+            "mean": plain(self.mean),
+            "variance": plain(self.variance()),
+            "min": plain(self.min),
+            "max": plain(self.max),
+        }
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch for positive values with bounded relative error.
+    Values are counted in logarithmic buckets (as in DDSketch): every quantile is
+    returned within relative_accuracy of the true value, memory grows with the
+    log of the value range rather than the number of values, and merging two
+    sketches is adding their bucket counts.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if not np.all((values > 0) & np.isfinite(values)):  # inf would land in a garbage bucket, nan in none
+            raise ValueError("QuantileSketch only accepts positive, finite values.")
+        keys, counts = np.unique(np.ceil(np.log(values) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += len(values)
+        return self
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge quantile sketches with different accuracy.")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Returns the approximate q-quantile (0 <= q <= 1), or nan when empty."""
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.buckets))
+
+    def histogram(self):
+        """Returns the distribution as (lower, upper, count) bucket triples."""
+        return [(self.gamma ** (key - 1), self.gamma ** key, self.buckets[key]) for key in sorted(self.buckets)]
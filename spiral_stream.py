@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import random
+import time
+
+from ring_buffer import RingBuffer
+from spiral_ai import SpiralAI
+
+class StreamReport:
+    """
+    Latency and throughput figures for a SpiralStream run.
+    Latency is measured from the moment a reading is pulled off its source until
+    its updated position is emitted; the most recent samples are kept in a ring.
+    """
+
+    def __init__(self, sample_limit=65536):
+        self.readings = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.started = None
+        self.finished = None
+        self.latencies = RingBuffer(sample_limit)
+
+    def record_batch(self, received_times, emitted):
+        if self.started is None:
+            self.started = received_times[0]
+        self.readings += len(received_times)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(received_times))
+        for received in received_times:
+            self.latencies.append(emitted - received)
+        self.finished = emitted
+
+    def percentile(self, fraction):
+        samples = sorted(self.latencies)
+        if not samples:
+            return 0.0
+        return samples[min(int(fraction * len(samples)), len(samples) - 1)]
+
+    def summary(self):
+        """Returns the report as a plain dict (times in milliseconds)."""
+        elapsed = (self.finished - self.started) if self.started is not None else 0.0
+        return {
+            "readings": self.readings,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "elapsed_s": elapsed,
+            "readings_per_s": self.readings / elapsed if elapsed > 0 else 0.0,
+            "latency_p50_ms": self.percentile(0.50) * 1000,
+            "latency_p95_ms": self.percentile(0.95) * 1000,
+            "latency_p99_ms": self.percentile(0.99) * 1000,
+        }
+
+class SpiralStream:
+    """
+    Asyncio front end feeding real-time readings into SpiralAI instances.
+    Readings are either plain numbers or (sensor_id, value) pairs; each sensor gets
+    its own SpiralAI, so one event loop serves many sensors without a thread each.
+    Readings are micro-batched: every batch applies adjust_growth_factor(value) and
+    next_value() per reading and is emitted as a list of (sensor_id, state) pairs.
+    """
+
+    def __init__(self, factory=SpiralAI, batch_size=1024, max_delay=0.005, queue_size=8192):
+        """
+        :param factory: Callable creating the SpiralAI for a new sensor.
+        :param batch_size: Maximum number of readings handled per batch.
+        :param max_delay: Seconds to wait for a batch to fill once its first reading arrives.
+        :param queue_size: Readings buffered ahead of processing; a full queue stops
+            pulling from the source, so slow consumers apply backpressure upstream.
+        """
+        self.factory = factory
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.spirals = {}
+        self.report = StreamReport()
+
+    def spiral(self, sensor):
+        """Returns the SpiralAI tracking a sensor, creating it on first use."""
+        spiral_ai = self.spirals.get(sensor)
+        if spiral_ai is None:
+            spiral_ai = self.spirals[sensor] = self.factory()
+        return spiral_ai
+
+    async def run(self, readings):
+        """
+        Consumes an async iterator of readings and yields one list of
+        (sensor_id, state) results per micro-batch.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        done = object()
+        pump = asyncio.create_task(self._pump(readings, queue, done))
+        try:
+            finished = False
+            while not finished:
+                batch, finished = await self._next_batch(queue, done)
+                if batch:
+                    yield self._apply(batch)
+            await pump  # Surfaces errors raised by the source
+        finally:
+            if not pump.done():
+                pump.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await pump
+
+    async def _pump(self, readings, queue, done):
+        try:
+            async for reading in readings:
+                await queue.put((time.perf_counter(), reading))
+        finally:
+            if not asyncio.current_task().cancelling():
+                await queue.put((None, done))
+
+    async def _next_batch(self, queue, done):
+        """Waits for one reading, then gathers more until the batch is full or max_delay passes."""
+        batch = []
+        received, reading = await queue.get()
+        if reading is done:
+            return batch, True
+        batch.append((received, reading))
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.batch_size:
+            try:
+                received, reading = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    received, reading = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if reading is done:
+                return batch, True
+            batch.append((received, reading))
+        return batch, False
+
+    def _apply(self, batch):
+        results = []
+        received_times = []
+        for received, reading in batch:
+            sensor, value = reading if isinstance(reading, tuple) else (None, reading)
+            spiral_ai = self.spiral(sensor)
+            spiral_ai.adjust_growth_factor(value)
+            results.append((sensor, spiral_ai.next_value()))
+            received_times.append(received)
+        self.report.record_batch(received_times, time.perf_counter())
+        return results
+
+### 📡 READING SOURCES ###
+
+def parse_reading(line):
+    """Parses 'value' or 'sensor_id value' text lines into readings."""
+    parts = line.split()
+    if len(parts) == 1:
+        return float(parts[0])
+    return parts[0], float(parts[1])
+
+def _parse_line(line, stats):
+    """parse_reading(), or None for a blank or malformed line (counted in stats["bad_lines"])."""
+    if not line.strip():
+        return None
+    try:
+        return parse_reading(line)
+    except ValueError:
+        if stats is not None:
+            stats["bad_lines"] = stats.get("bad_lines", 0) + 1
+        return None
+
+async def queue_source(queue, sentinel=None):
+    """Yields readings put on an asyncio.Queue until the sentinel arrives."""
+    while True:
+        reading = await queue.get()
+        if reading is sentinel:
+            return
+        yield reading
+
+async def tail_source(path, poll_interval=0.1, follow=True, stats=None):
+    """
+    Yields readings appended to a text file, like `tail -f`.
+    :param stats: Optional dict; malformed lines are skipped and counted in stats["bad_lines"].
+    """
+    with open(path, "r") as f:
+        partial = ""  # Text of a line the writer has not finished yet
+        while True:
+            line = f.readline()
+            if line.endswith("\n"):
+                reading = _parse_line(partial + line, stats)
+                partial = ""
+                if reading is not None:
+                    yield reading
+            elif line:
+                partial += line
+            else:
+                if not follow:
+                    # The file is complete, so an unterminated last line is too
+                    reading = _parse_line(partial, stats)
+                    if reading is not None:
+                        yield reading
+                    return
+                await asyncio.sleep(poll_interval)
+
+async def socket_source(host, port, stats=None):
+    """
+    Yields readings sent as text lines over a TCP connection.
+    :param stats: Optional dict; malformed lines are skipped and counted in stats["bad_lines"].
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            reading = _parse_line(line.decode(errors="replace"), stats)
+            if reading is not None:
+                yield reading
+    finally:
+        writer.close()
+
+# Example Usage:
+if __name__ == "__main__":
+    async def simulated_sensors(count, sensors=100):
+        for i in range(count):
+            yield f"sensor-{i % sensors}", random.uniform(-0.01, 0.01)
+            if i % 1000 == 0:
+                await asyncio.sleep(0)  # Let the event loop breathe, like a real feed
+
+    async def main():
+        stream = SpiralStream(factory=lambda: SpiralAI(start=1, adaptability=0.05, log_space=True))
+        async for batch in stream.run(simulated_sensors(100000)):
+            pass
+        print(f"Spiral stream report: {stream.report.summary()}")
+
+    asyncio.run(main())
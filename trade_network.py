@@ -0,0 +1,147 @@
+import heapq
+import math
+from collections import defaultdict
+
+class ShortestPathTree:
+    """
+    Cheapest routes from one origin port to every reachable port.
+    Besides distances and parents the tree keeps each port's children, so the
+    ports whose route ran over a lane that got dearer can be found directly.
+    """
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.dist = {origin: 0.0}
+        self.parent = {origin: None}
+        self.children = defaultdict(set)
+
+    def set_parent(self, port, parent):
+        old = self.parent.get(port)
+        if old is not None:
+            self.children[old].discard(port)
+        self.parent[port] = parent
+        if parent is not None:
+            self.children[parent].add(port)
+
+    def subtree(self, port):
+        """Returns the port and every port routed through it."""
+        found = [port]
+        stack = [port]
+        while stack:
+            for child in self.children.get(stack.pop(), ()):
+                found.append(child)
+                stack.append(child)
+        return found
+
+    def path(self, destination):
+        """Returns the ports on the cheapest route, or None when unreachable."""
+        if self.dist.get(destination, math.inf) == math.inf:
+            return None
+        ports = [destination]
+        while ports[-1] != self.origin:
+            ports.append(self.parent[ports[-1]])
+        return ports[::-1]
+
+class RouteNetwork:
+    """
+    Directed graph of ports and lanes that keeps cheapest routes up to date.
+    Only origins registered with track() get a shortest-path tree. When lane costs
+    change, update_lanes() repairs each tree incrementally: a dearer tree lane
+    invalidates just the ports routed through it, a cheaper lane seeds relaxation
+    from its head, and one heap-based (Dijkstra) pass settles only the ports whose
+    cost actually changes instead of recomputing every route.
+    """
+
+    def __init__(self, lanes=()):
+        """
+        :param lanes: Iterable of (origin_port, destination_port, cost) triples.
+        """
+        self.out_lanes = defaultdict(dict)
+        self.in_lanes = defaultdict(dict)
+        self.trees = {}
+        for origin, destination, cost in lanes:
+            self.out_lanes[origin][destination] = cost
+            self.in_lanes[destination][origin] = cost
+
+    def lanes(self):
+        return [(origin, destination) for origin, targets in self.out_lanes.items() for destination in targets]
+
+    def cost(self, origin, destination):
+        return self.out_lanes[origin][destination]
+
+    def track(self, origin):
+        """Starts maintaining cheapest routes from an origin port."""
+        if origin not in self.trees:
+            tree = self.trees[origin] = ShortestPathTree(origin)
+            self._settle(tree, [(0.0, origin)])
+        return self.trees[origin]
+
+    def route(self, origin, destination):
+        """Returns (cost, ports) of the cheapest route, or (inf, None) when unreachable."""
+        tree = self.track(origin)
+        return tree.dist.get(destination, math.inf), tree.path(destination)
+
+    def update_lanes(self, changes):
+        """
+        Applies new lane costs and repairs every tracked tree.
+        :param changes: Mapping or iterable of ((origin, destination), new_cost); new lanes are added.
+            A lane listed more than once takes its last cost.
+        """
+        # One entry per lane, so each repair compares against the cost the trees were built with
+        changes = list(dict(changes).items())
+        previous = []
+        for (origin, destination), cost in changes:
+            previous.append(self.out_lanes[origin].get(destination, math.inf))
+            self.out_lanes[origin][destination] = cost
+            self.in_lanes[destination][origin] = cost
+        for tree in self.trees.values():
+            self._repair(tree, changes, previous)
+
+    def _repair(self, tree, changes, previous):
+        # Dearer lanes on the tree invalidate the ports routed through them
+        affected = set()
+        for ((origin, destination), cost), old in zip(changes, previous):
+            if cost > old and tree.parent.get(destination) == origin and destination not in affected:
+                affected.update(tree.subtree(destination))
+        heap = []
+        for port in affected:
+            tree.dist[port] = math.inf
+        for port in affected:
+            tree.set_parent(port, None)
+            best, best_parent = math.inf, None
+            for neighbour, cost in self.in_lanes[port].items():
+                candidate = tree.dist.get(neighbour, math.inf) + cost
+                if candidate < best:
+                    best, best_parent = candidate, neighbour
+            if best_parent is not None:
+                tree.dist[port] = best
+                tree.set_parent(port, best_parent)
+                heap.append((best, port))
+        # Cheaper lanes may open better routes from their origin port
+        for ((origin, destination), cost), old in zip(changes, previous):
+            if cost < old:
+                candidate = tree.dist.get(origin, math.inf) + cost
+                if candidate < tree.dist.get(destination, math.inf):
+                    tree.dist[destination] = candidate
+                    tree.set_parent(destination, origin)
+                    heap.append((candidate, destination))
+        heapq.heapify(heap)
+        self._settle(tree, heap)
+        for port in affected:
+            if tree.dist[port] == math.inf:
+                del tree.dist[port]
+                tree.parent.pop(port, None)
+
+    def _settle(self, tree, heap):
+        """Dijkstra from the queued ports, with stale heap entries skipped."""
+        dist = tree.dist
+        while heap:
+            distance, port = heapq.heappop(heap)
+            if distance > dist.get(port, math.inf):
+                continue
+            for neighbour, cost in self.out_lanes.get(port, {}).items():
+                candidate = distance + cost
+                if candidate < dist.get(neighbour, math.inf):
+                    dist[neighbour] = candidate
+                    tree.set_parent(neighbour, port)
+                    heapq.heappush(heap, (candidate, neighbour))
@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class Endpoint:
+    """
+    A summary API: a URL template with a {query} placeholder and the JSON field
+    holding the summary text. Point the template at a local stub server to test
+    without the network.
+    """
+
+    def __init__(self, name, url, field):
+        self.name = name
+        self.url = url
+        self.field = field
+
+    def url_for(self, query):
+        return self.url.format(query=quote(query, safe=""))
+
+WIKIPEDIA = Endpoint("wikipedia", "https://en.wikipedia.org/api/rest_v1/page/summary/{query}", "extract")
+DUCKDUCKGO = Endpoint("duckduckgo", "https://api.duckduckgo.com/?q={query}&format=json", "AbstractText")
+
+class FetchError(Exception):
+    """No endpoint could be reached for a query (such failures are never cached)."""
+
+class WebFetcher:
+    """
+    Shared fetch layer for the knowledge bases' web_search.
+    Requests go through one pooled requests.Session, so repeated lookups reuse
+    keep-alive connections. Results are cached on disk: summaries for ttl
+    seconds, and misses (no endpoint had a summary) for the shorter negative_ttl,
+    so an unknown term is not re-fetched on every question.
+    """
+
+    def __init__(self, endpoints=(WIKIPEDIA,), cache_file="web_cache.db", ttl=7 * 24 * 3600, negative_ttl=3600,
+                 timeout=5, user_agent="SpiralAI/1.0", pool_size=10):
+        """
+        :param endpoints: Endpoints tried in order until one has a summary.
+        :param cache_file: SQLite file for cached results; None keeps the cache in memory only.
+        :param ttl: Seconds a found summary stays cached.
+        :param negative_ttl: Seconds a miss stays cached.
+        :param timeout: Per-request timeout in seconds.
+        :param pool_size: Connections kept alive per host.
+        """
+        self.endpoints = list(endpoints)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "fetches": 0, "errors": 0, "fetch_seconds": 0.0}
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def _cache(self):
+        # Opened on first use, so constructing a knowledge base creates no files
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.cache_file or ":memory:", check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS web_cache (key TEXT PRIMARY KEY, text TEXT, expires REAL)")
+            self._connection.commit()
+        return self._connection
+
+    def _key(self, query):
+        return json.dumps([[endpoint.name for endpoint in self.endpoints], " ".join(query.split())])
+
+    def search(self, query):
+        """
+        Returns the first summary an endpoint has for query: None if no endpoint
+        knows the topic, "" if a page exists but has no summary text.
+        Raises FetchError if every endpoint failed without an answer.
+        """
+        key = self._key(query)
+        with self._lock:
+            row = self._cache.execute("SELECT text, expires FROM web_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] > time.time():
+            self._count("hits" if row[0] else "negative_hits")
+            return row[0]
+
+        self._count("misses")
+        text, failures = None, []
+        for endpoint in self.endpoints:
+            try:
+                found = self._fetch(endpoint, query)
+            except requests.exceptions.RequestException as error:
+                self._count("errors")
+                failures.append(f"{endpoint.name}: {error}")
+                continue
+            if found:
+                text = found
+                break
+            if found == "" and text is None:
+                text = ""
+        if not text and failures:
+            raise FetchError("; ".join(failures))
+
+        expires = time.time() + (self.ttl if text else self.negative_ttl)
+        with self._lock:
+            self._cache.execute("INSERT OR REPLACE INTO web_cache VALUES (?, ?, ?)", (key, text, expires))
+            self._cache.commit()
+        return text
+
+    def _fetch(self, endpoint, query):
+        """Returns the endpoint's summary, "" for an empty one, or None when it has no page."""
+        start = time.perf_counter()
+        try:
+            response = self.session.get(endpoint.url_for(query), timeout=self.timeout)
+        finally:
+            self._count("fetches")
+            self._count("fetch_seconds", time.perf_counter() - start)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()  # 5xx / rate limits are errors, not misses
+        return response.json().get(endpoint.field) or ""
+
+    def _count(self, name, amount=1):
+        # One fetcher serves every request thread, so counters are only updated under the lock
+        with self._lock:
+            self.stats[name] += amount
+
+    def hit_rate(self):
+        """Share of searches answered from the cache (found or negative)."""
+        with self._lock:
+            cached = self.stats["hits"] + self.stats["negative_hits"]
+            misses = self.stats["misses"]
+        return cached / (cached + misses) if cached + misses else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._cache.execute("DELETE FROM web_cache")
+            self._cache.commit()
+
+# Example Usage: searches against a local stub endpoint, so fetching and caching can be checked offline
+if __name__ == "__main__":
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubSummaries(BaseHTTPRequestHandler):
+        """Knows one topic; every other page is a 404, like a missing Wikipedia article."""
+
+        def do_GET(self):
+            known = unquote(self.path.rsplit("/", 1)[1]).lower() == "gravity"
+            body = json.dumps({"extract": "Gravity pulls masses together."} if known else {}).encode()
+            self.send_response(200 if known else 404)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSummaries)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = Endpoint("stub", f"http://127.0.0.1:{server.server_port}/summary/{{query}}", "extract")
+    fetcher = WebFetcher([stub], cache_file=None)
+    with ThreadPoolExecutor(8) as pool:  # As Flask's request threads share one fetcher
+        results = list(pool.map(fetcher.search, ["Gravity", "Unknown topic"] * 100))
+    server.shutdown()
+    print(f"{results[0]!r}, {results[1]!r}")
+    print(f"Stats: {fetcher.stats}, hit rate {fetcher.hit_rate():.0%}")